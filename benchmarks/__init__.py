@@ -0,0 +1,3 @@
+"""
+Headless benchmarks of the picker, see benchmarks.run.
+"""
@@ -0,0 +1,247 @@
+"""
+Minimal stand-in of the maya modules used by dwpicker. It only holds what
+the benchmarks need to run outside of Maya: option variables, a selection,
+nodes with string attributes and callbacks which are never triggered.
+"""
+import fnmatch
+import importlib
+import sys
+import types
+
+
+class Stub(object):
+    """
+    Accept any attribute access or call, used for the Maya API classes
+    and the commands the benchmarks don't care about.
+    """
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Stub()
+
+    def __call__(self, *_, **__):
+        return Stub()
+
+    def __int__(self):
+        return 0
+
+    __index__ = __int__
+
+
+class Scene():
+    def __init__(self):
+        self.nodes = {}
+        self.selection = []
+        self.optionvars = {}
+
+    def clear(self):
+        self.nodes = {}
+        self.selection = []
+
+
+scene = Scene()
+
+
+def split_plug(name):
+    node, _, attribute = name.partition('.')
+    return node, attribute
+
+
+def obj_exists(name):
+    node, attribute = split_plug(name)
+    if node not in scene.nodes:
+        return False
+    return not attribute or attribute in scene.nodes[node]
+
+
+def ls(*args, **kwargs):
+    if kwargs.get('selection') or kwargs.get('sl'):
+        nodes = scene.selection[:]
+    elif not args:
+        nodes = list(scene.nodes)
+    else:
+        patterns = args[0]
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        plugs = [
+            node + '.' + attribute for node, attributes in scene.nodes.items()
+            for attribute in attributes]
+        nodes = []
+        for pattern in patterns:
+            if '*' not in pattern:
+                nodes.extend([pattern] if obj_exists(pattern) else [])
+                continue
+            candidates = plugs if '.' in pattern else scene.nodes
+            # Like in Maya, a wildcard doesn't match a namespace separator.
+            candidates = [
+                c for c in candidates if c.count(':') == pattern.count(':')]
+            nodes.extend(fnmatch.filter(candidates, pattern))
+    if kwargs.get('long'):
+        nodes = ['|' + node if '.' not in node else node for node in nodes]
+    return nodes
+
+
+def select(*args, **kwargs):
+    nodes = args[0] if args else []
+    if isinstance(nodes, str):
+        nodes = [nodes]
+    nodes = [node.lstrip('|') for node in nodes]
+    if kwargs.get('clear'):
+        scene.selection = []
+    elif kwargs.get('add'):
+        scene.selection.extend(n for n in nodes if n not in scene.selection)
+    else:
+        scene.selection = nodes
+
+
+def create_node(_, name=None, **__):
+    name = name or 'node{}'.format(len(scene.nodes))
+    scene.nodes[name] = {}
+    return name
+
+
+def add_attr(node, longName=None, **_):
+    scene.nodes[node][longName] = None
+
+
+def set_attr(plug, *values, **_):
+    node, attribute = split_plug(plug)
+    scene.nodes[node][attribute] = values[0] if values else None
+
+
+def get_attr(plug, **_):
+    node, attribute = split_plug(plug)
+    return scene.nodes[node][attribute]
+
+
+def attribute_query(attribute, node=None, exists=False, **_):
+    return attribute in scene.nodes.get(node, {})
+
+
+def delete_attr(node, attribute=None, **_):
+    scene.nodes[node].pop(attribute, None)
+
+
+def delete(*nodes, **_):
+    for node in nodes:
+        scene.nodes.pop(node, None)
+
+
+def option_var(**kwargs):
+    if 'query' in kwargs or 'q' in kwargs:
+        return scene.optionvars.get(kwargs.get('query', kwargs.get('q')))
+    if 'exists' in kwargs:
+        return kwargs['exists'] in scene.optionvars
+    if 'remove' in kwargs:
+        scene.optionvars.pop(kwargs['remove'], None)
+        return
+    for flag in ('intValue', 'floatValue', 'stringValue'):
+        if flag in kwargs:
+            name, value = kwargs[flag]
+            scene.optionvars[name] = value
+            return
+    for flag in ('stringValueAppend', 'intValueAppend'):
+        if flag in kwargs:
+            name, value = kwargs[flag]
+            values = scene.optionvars.get(name)
+            if not isinstance(values, list):
+                values = [] if values is None else [values]
+            scene.optionvars[name] = values + [value]
+            return
+
+
+def namespace_info(*_, **kwargs):
+    if kwargs.get('currentNamespace'):
+        return ':'
+    return []
+
+
+class CmdsStub(types.ModuleType):
+    def __init__(self, maya_version):
+        super(CmdsStub, self).__init__('maya.cmds')
+        self.maya_version = maya_version
+        self.about = self._about
+        self.ls = ls
+        self.select = select
+        self.objExists = obj_exists
+        self.createNode = create_node
+        self.addAttr = add_attr
+        self.setAttr = set_attr
+        self.getAttr = get_attr
+        self.attributeQuery = attribute_query
+        self.deleteAttr = delete_attr
+        self.delete = delete
+        self.optionVar = option_var
+        self.namespaceInfo = namespace_info
+        self.evalDeferred = self._eval_deferred
+
+    def _about(self, **kwargs):
+        if kwargs.get('majorVersion') or kwargs.get('version'):
+            return self.maya_version
+        return ''
+
+    @staticmethod
+    def _eval_deferred(command, **_):
+        if callable(command):
+            command()
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Stub()
+
+
+class ApiStub(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Stub()
+
+
+class MayaQWidgetDockableMixin(object):
+    pass
+
+
+def install(maya_version=None):
+    """
+    Register the stub modules in sys.modules. It does nothing if Maya is
+    available. The version decides which PySide dwpicker imports (see
+    dwpicker.pyside), it is guessed from the installed one by default.
+    """
+    try:
+        importlib.import_module('maya.cmds')
+        if not isinstance(sys.modules['maya.cmds'], CmdsStub):
+            return
+    except ImportError:
+        pass
+
+    if maya_version is None:
+        try:
+            importlib.import_module('PySide6')
+            maya_version = '2025'
+        except ImportError:
+            maya_version = '2022'
+
+    maya = types.ModuleType('maya')
+    maya.__path__ = []
+    modules = {
+        'maya': maya,
+        'maya.cmds': CmdsStub(maya_version),
+        'maya.mel': ApiStub('maya.mel'),
+        'maya.utils': ApiStub('maya.utils'),
+        'maya.OpenMaya': ApiStub('maya.OpenMaya'),
+        'maya.OpenMayaUI': ApiStub('maya.OpenMayaUI'),
+        'maya.app': types.ModuleType('maya.app'),
+        'maya.app.general': types.ModuleType('maya.app.general'),
+        'maya.app.general.mayaMixin': types.ModuleType(
+            'maya.app.general.mayaMixin')}
+    modules['maya.app.general.mayaMixin'].MayaQWidgetDockableMixin = (
+        MayaQWidgetDockableMixin)
+    for name, module in modules.items():
+        sys.modules[name] = module
+        parent, _, child = name.rpartition('.')
+        if parent:
+            setattr(modules[parent], child, module)
+
+    from dwpicker.optionvar import OPTIONVARS
+    scene.optionvars.update(OPTIONVARS)
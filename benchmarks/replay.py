@@ -0,0 +1,199 @@
+"""
+Replay a trace recorded with dwpicker.start_trace_recording against the
+documents it contains and report the latency of each event type.
+
+usage:
+    python -m benchmarks.replay trace.json --output report.json
+
+The latency of an event covers its handling and the repaints it triggers.
+With --max-p95, the command fails if an event type goes over the budget,
+so a trace can be used as a performance regression test.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from benchmarks import mayastub  # noqa
+mayastub.install()
+
+from dwpicker.document import PickerDocument  # noqa
+from dwpicker.picker import PickerPanelView, VisibilityLayersMenu  # noqa
+from dwpicker.profiling import clock  # noqa
+from dwpicker.pyside import QtCore, QtGui, QtWidgets  # noqa
+from dwpicker.trace import KEY_EVENTS, MOUSE_EVENTS  # noqa
+
+
+# Upper bounds (ms) of the histogram buckets, the last one is unbounded.
+HISTOGRAM_BUCKETS = 1, 2, 4, 8, 16, 33, 66, 133, 266
+
+
+def event_types(events):
+    return {name: event_type for event_type, name in events.items()}
+
+
+MOUSE_EVENT_TYPES = event_types(MOUSE_EVENTS)
+KEY_EVENT_TYPES = event_types(KEY_EVENTS)
+
+
+def disable_menus():
+    # Context menus would block the replay waiting for a user action.
+    def exec_(*_, **__):
+        return None
+    QtWidgets.QMenu.exec_ = exec_
+    QtWidgets.QMenu.exec = exec_
+
+
+def create_views(trace):
+    from dwpicker.designer.editor import PickerEditor
+
+    documents = [PickerDocument(data) for data in trace['documents']]
+    views = []
+    # The parents (layers menus, editors) are kept alive with the views.
+    owners = []
+    for state in trace['views']:
+        document = documents[state['document']]
+        if state['kind'] == 'canvas':
+            editor = PickerEditor(document)
+            editor.show()
+            view = editor.shape_canvas
+            owners.append(editor)
+        else:
+            layers_menu = VisibilityLayersMenu(document)
+            view = PickerPanelView(
+                document, panel=state['panel'], layers_menu=layers_menu)
+            owners.append(layers_menu)
+        view.resize(*state['size'])
+        view.show()
+        view.viewportmapper.viewsize = view.size()
+        view.viewportmapper.zoom = state['zoom']
+        view.viewportmapper.origin = QtCore.QPointF(*state['origin'])
+        views.append(view)
+    QtWidgets.QApplication.processEvents()
+    return views, owners
+
+
+def create_event(data):
+    modifiers = QtCore.Qt.KeyboardModifiers(data['modifiers'])
+    if data['type'] in KEY_EVENT_TYPES:
+        return QtGui.QKeyEvent(
+            KEY_EVENT_TYPES[data['type']], data['key'], modifiers,
+            data['text'], data['autorepeat'])
+
+    position = QtCore.QPointF(*data['position'])
+    buttons = QtCore.Qt.MouseButtons(data['buttons'])
+    if data['type'] == 'wheel':
+        return QtGui.QWheelEvent(
+            position, position, QtCore.QPoint(0, 0),
+            QtCore.QPoint(*data['delta']), buttons, modifiers,
+            QtCore.Qt.NoScrollPhase, False)
+
+    return QtGui.QMouseEvent(
+        MOUSE_EVENT_TYPES[data['type']], position, position,
+        QtCore.Qt.MouseButton(data['button']), buttons, modifiers)
+
+
+def replay(trace, realtime=False):
+    """
+    Return the latencies (in seconds) by event type.
+    realtime: wait between the events as recorded, the coalescing of the
+    repaints and timers then matches the recording session.
+    """
+    views, owners = create_views(trace)
+    application = QtWidgets.QApplication.instance()
+    latencies = {}
+    start = clock()
+    for data in trace['events']:
+        if realtime:
+            while clock() - start < data['time']:
+                application.processEvents()
+                time.sleep(0.001)
+        event = create_event(data)
+        view = views[data['view']]
+        event_start = clock()
+        application.sendEvent(view, event)
+        application.processEvents()
+        latency = clock() - event_start
+        latencies.setdefault(data['type'], []).append(latency)
+    del owners
+    return latencies
+
+
+def histogram(latencies):
+    counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    for latency in latencies:
+        for i, bucket in enumerate(HISTOGRAM_BUCKETS):
+            if latency * 1000 <= bucket:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = ['<={}ms'.format(b) for b in HISTOGRAM_BUCKETS]
+    labels.append('>{}ms'.format(HISTOGRAM_BUCKETS[-1]))
+    return dict(zip(labels, counts))
+
+
+def statistics(latencies):
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        index = min(len(latencies) - 1, int(len(latencies) * p))
+        return latencies[index] * 1000
+
+    return {
+        'count': len(latencies),
+        'mean': sum(latencies) / len(latencies) * 1000,
+        'p50': percentile(.5),
+        'p95': percentile(.95),
+        'max': latencies[-1] * 1000,
+        'histogram': histogram(latencies)}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('trace', help='Trace file to replay.')
+    parser.add_argument(
+        '--realtime', action='store_true',
+        help='Respect the recorded delays between the events.')
+    parser.add_argument(
+        '--max-p95', type=float,
+        help='Fail if the p95 latency (ms) of an event type exceeds it.')
+    parser.add_argument(
+        '--output', help='JSON file to write, printed if not set.')
+    arguments = parser.parse_args(args)
+
+    with open(arguments.trace, 'r') as f:
+        trace = json.load(f)
+
+    application = QtWidgets.QApplication.instance()
+    application = application or QtWidgets.QApplication(sys.argv[:1])
+    disable_menus()
+    latencies = replay(trace, arguments.realtime)
+    report = {
+        'trace': os.path.basename(arguments.trace),
+        'qt_version': QtCore.qVersion(),
+        'events': {
+            name: statistics(values) for name, values in latencies.items()}}
+
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if arguments.max_p95 is None:
+        return 0
+    over_budget = [
+        name for name, stats in report['events'].items()
+        if stats['p95'] > arguments.max_p95]
+    for name in over_budget:
+        sys.stderr.write('{}: p95 over budget ({:.2f}ms)\n'.format(
+            name, report['events'][name]['p95']))
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Time the picker hot paths on synthetic pickers outside of Maya.
+
+usage:
+    python -m benchmarks.run --sizes 100 1000 10000 --output results.json
+
+The results are written as JSON to compare runs across versions. Each
+benchmark reports the min, mean, median and max durations in milliseconds.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+from copy import deepcopy
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from benchmarks import mayastub  # noqa
+mayastub.install()
+
+from dwpicker.appinfos import VERSION  # noqa
+from dwpicker.compatibility import ensure_retro_compatibility  # noqa
+from dwpicker.document import PickerDocument  # noqa
+from dwpicker.optionvar import (  # noqa
+    USE_COMPRESSED_DATA_CHUNKS, save_optionvar)
+from dwpicker.picker import PickerPanelView, VisibilityLayersMenu  # noqa
+from dwpicker.profiling import clock  # noqa
+from dwpicker.pyside import QtCore, QtGui, QtWidgets  # noqa
+from dwpicker.scenedata import (  # noqa
+    decode_data, encode_data, load_local_picker_data,
+    store_local_picker_data)
+from benchmarks.synthetic import create_images, generate_picker  # noqa
+
+
+DEFAULT_SIZES = 100, 1000, 10000, 50000
+VIEW_SIZE = 1280, 720
+MOUSE_MOVES = 200
+UNDO_STEPS = 20
+
+
+def summarize(durations):
+    durations = sorted(durations)
+    return {
+        'min': durations[0] * 1000,
+        'mean': sum(durations) / len(durations) * 1000,
+        'median': durations[len(durations) // 2] * 1000,
+        'max': durations[-1] * 1000,
+        'runs': len(durations)}
+
+
+def measure(function, repeat, setup=None):
+    """
+    Call the function repeat times and return the durations summary.
+    setup: called before each run, its result is given to the function.
+    """
+    durations = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        start = clock()
+        function(*args)
+        durations.append(clock() - start)
+    return summarize(durations)
+
+
+def wait_for_images():
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    QtWidgets.QApplication.processEvents()
+
+
+def create_view(document, panel=0):
+    layers_menu = VisibilityLayersMenu(document)
+    view = PickerPanelView(document, panel=panel, layers_menu=layers_menu)
+    view.resize(*VIEW_SIZE)
+    view.viewportmapper.viewsize = view.size()
+    view.reset(selection_only=False)
+    # Keep the menu alive with the view.
+    view.benchmark_layers_menu = layers_menu
+    return view
+
+
+def mouse_move_event(point):
+    return QtGui.QMouseEvent(
+        QtCore.QEvent.MouseMove, QtCore.QPointF(point),
+        QtCore.QPointF(point), QtCore.Qt.NoButton, QtCore.Qt.NoButton,
+        QtCore.Qt.NoModifier)
+
+
+def benchmark_document(data, repeat):
+    return measure(
+        lambda data: PickerDocument(data),
+        repeat, setup=lambda: deepcopy(data))
+
+
+def benchmark_hit_testing(document, repeat):
+    view = create_view(document)
+    rand = random.Random(0)
+    points = [
+        QtCore.QPoint(
+            rand.randrange(VIEW_SIZE[0]), rand.randrange(VIEW_SIZE[1]))
+        for _ in range(MOUSE_MOVES)]
+    events = [mouse_move_event(point) for point in points]
+
+    def run():
+        for event in events:
+            view.mouseMoveEvent(event)
+
+    result = measure(run, repeat)
+    view.deleteLater()
+    return result
+
+
+def benchmark_paint(document, repeat, zoom=None):
+    view = create_view(document)
+    if zoom:
+        view.viewportmapper.zoom *= zoom
+    image = QtGui.QImage(
+        view.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+
+    def run():
+        view.static_layer.invalidate()
+        view.render(image)
+
+    # Decode the images before measuring.
+    run()
+    wait_for_images()
+    result = measure(run, repeat)
+    view.deleteLater()
+    return result
+
+
+def benchmark_undo(data, repeat):
+    document = PickerDocument(deepcopy(data))
+    rand = random.Random(0)
+    shapes = document.shapes
+
+    def record():
+        for _ in range(UNDO_STEPS):
+            for shape in rand.sample(shapes, min(10, len(shapes))):
+                shape.rect.translate(1, 0)
+                shape.synchronize_rect()
+            document.record_undo()
+
+    def undo():
+        for _ in range(UNDO_STEPS):
+            document.undo()
+
+    def redo():
+        for _ in range(UNDO_STEPS):
+            document.redo()
+
+    results = {'record_undo': [], 'undo': [], 'redo': []}
+    for _ in range(repeat):
+        for name, function in zip(results, (record, undo, redo)):
+            start = clock()
+            function()
+            results[name].append(clock() - start)
+    return {name: summarize(d) for name, d in results.items()}
+
+
+def benchmark_scene_data(data, repeat):
+    pickers = [data]
+    encoded = encode_data(pickers)
+    results = {
+        'encode': measure(lambda: encode_data(pickers), repeat),
+        'decode': measure(lambda: decode_data(encoded), repeat)}
+    for chunks in (0, 1):
+        save_optionvar(USE_COMPRESSED_DATA_CHUNKS, chunks)
+        suffix = '_chunks' if chunks else ''
+        results['store' + suffix] = measure(
+            lambda: store_local_picker_data(pickers), repeat)
+        results['load' + suffix] = measure(load_local_picker_data, repeat)
+    save_optionvar(USE_COMPRESSED_DATA_CHUNKS, 0)
+    return results
+
+
+def benchmark_file(data, repeat, directory):
+    filename = os.path.join(directory, 'picker.json')
+
+    def save():
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def load():
+        with open(filename, 'r') as f:
+            ensure_retro_compatibility(json.load(f))
+
+    return {
+        'save': measure(save, repeat),
+        'load': measure(load, repeat)}
+
+
+def run_benchmarks(sizes, repeat, use_images=True):
+    directory = tempfile.mkdtemp(prefix='dwpicker_benchmarks')
+    try:
+        images = create_images(directory) if use_images else []
+        results = {}
+        for size in sizes:
+            mayastub.scene.clear()
+            data = generate_picker(size, images=images)
+            document = PickerDocument(deepcopy(data))
+            result = {
+                'document_creation': benchmark_document(data, repeat),
+                'hit_testing': benchmark_hit_testing(document, repeat),
+                'paint_fit': benchmark_paint(document, repeat),
+                'paint_zoomed': benchmark_paint(document, repeat, zoom=4),
+                'undo': benchmark_undo(data, repeat),
+                'scene_data': benchmark_scene_data(data, repeat),
+                'file': benchmark_file(data, repeat, directory)}
+            results[str(size)] = result
+            sys.stderr.write('{} shapes done.\n'.format(size))
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+        help='Number of shapes of the synthetic pickers.')
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help='Runs per benchmark.')
+    parser.add_argument(
+        '--no-images', action='store_true',
+        help='Generate the pickers without images.')
+    parser.add_argument(
+        '--output', help='JSON file to write, printed if not set.')
+    arguments = parser.parse_args(args)
+
+    application = QtWidgets.QApplication.instance()
+    application = application or QtWidgets.QApplication(sys.argv[:1])
+    report = {
+        'dwpicker_version': '.'.join(str(n) for n in VERSION),
+        'qt_version': QtCore.qVersion(),
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'date': datetime.datetime.now().isoformat(),
+        'repeat': arguments.repeat,
+        'results': run_benchmarks(
+            arguments.sizes, arguments.repeat, not arguments.no_images)}
+
+    if not arguments.output:
+        print(json.dumps(report, indent=2))
+        return
+    with open(arguments.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
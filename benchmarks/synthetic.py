@@ -0,0 +1,124 @@
+"""
+Generation of large pickers mixing the shapes and features found in
+production pickers: square, round, rounded and custom path buttons,
+images, hierarchies, visibility layers and multiple panels.
+"""
+import math
+import os
+import random
+import uuid
+from copy import deepcopy
+
+from benchmarks.mayastub import scene
+
+
+SHAPE_TYPES = 'square', 'round', 'rounded_rect', 'custom'
+BUTTON_SIZE = 30
+BUTTON_SPACING = 10
+IMAGE_SIZES = 64, 512, 2048
+LAYERS = 'body', 'face', 'fingers', 'fk', 'ik'
+
+
+def circle_path(radius, points=8):
+    """
+    Relative custom path (see dwpicker.shapepath) of a polygon.
+    """
+    path = []
+    for i in range(points):
+        angle = 2 * math.pi * i / points
+        x = radius + radius * math.cos(angle)
+        y = radius + radius * math.sin(angle)
+        path.append({'point': [x, y], 'tangent_in': None, 'tangent_out': None})
+    return path
+
+
+def create_images(directory):
+    """
+    Write an image per size in IMAGE_SIZES and return their paths.
+    """
+    from dwpicker.pyside import QtGui
+    paths = []
+    for size in IMAGE_SIZES:
+        path = os.path.join(directory, 'image_{}.png'.format(size))
+        if not os.path.exists(path):
+            image = QtGui.QImage(size, size, QtGui.QImage.Format_ARGB32)
+            image.fill(QtGui.QColor('#446688'))
+            image.save(path)
+        paths.append(path)
+    return paths
+
+
+def generate_picker(
+        shapes_count, panels_count=2, images=None, image_ratio=0.02,
+        hierarchy_depth=3, seed=0):
+    """
+    Return picker data with the given number of buttons spread on a grid
+    in each panel. The buttons targets are registered in the stub scene.
+    images: paths of the images used by some buttons and the backgrounds.
+    image_ratio: proportion of the buttons displaying an image.
+    hierarchy_depth: length of the children chains.
+    """
+    from dwpicker.templates import BACKGROUND, BUTTON, PICKER
+
+    rand = random.Random(seed)
+    images = images or []
+    general = deepcopy(PICKER)
+    general['name'] = 'Synthetic {}'.format(shapes_count)
+    general['panels'] = [[1.0, [1.0 / panels_count] * panels_count]]
+    general['panels.zoom_locked'] = [False] * panels_count
+    general['panels.colors'] = [None] * panels_count
+    general['panels.names'] = [
+        'Panel {}'.format(i + 1) for i in range(panels_count)]
+
+    shapes = []
+    per_panel = int(math.ceil(float(shapes_count) / panels_count))
+    columns = max(1, int(math.sqrt(per_panel)))
+    step = BUTTON_SIZE + BUTTON_SPACING
+    for panel in range(panels_count):
+        if images:
+            background = deepcopy(BACKGROUND)
+            background['id'] = str(uuid.uuid4())
+            background['children'] = []
+            background['panel'] = panel
+            background['image.path'] = images[-1]
+            background['shape.width'] = columns * step
+            background['shape.height'] = columns * step
+            shapes.append(background)
+
+    parents = {}
+    for i in range(shapes_count):
+        panel = i % panels_count
+        index = i // panels_count
+        options = deepcopy(BUTTON)
+        options['id'] = str(uuid.uuid4())
+        options['children'] = []
+        options['panel'] = panel
+        options['shape'] = rand.choice(SHAPE_TYPES)
+        options['shape.left'] = float((index % columns) * step)
+        options['shape.top'] = float((index // columns) * step)
+        options['shape.width'] = float(BUTTON_SIZE)
+        options['shape.height'] = float(BUTTON_SIZE)
+        if options['shape'] == 'custom':
+            options['shape.path'] = circle_path(BUTTON_SIZE / 2.0)
+        options['text.content'] = 'b{}'.format(i) if i % 3 else ''
+        if rand.random() < .5:
+            options['visibility_layer'] = rand.choice(LAYERS)
+        if images and rand.random() < image_ratio:
+            options['image.path'] = rand.choice(images)
+            options['image.width'] = float(BUTTON_SIZE)
+            options['image.height'] = float(BUTTON_SIZE)
+
+        targets = ['ctrl_{}'.format(i)]
+        if rand.random() < .1:
+            targets.append('ctrl_{}'.format(rand.randrange(shapes_count)))
+        options['action.targets'] = targets
+        for target in targets:
+            scene.nodes.setdefault(target, {})
+
+        parent = parents.get(panel)
+        if parent and index % hierarchy_depth:
+            parent['children'].append(options['id'])
+        parents[panel] = options
+        shapes.append(options)
+
+    return {'general': general, 'shapes': shapes}
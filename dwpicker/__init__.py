@@ -5,6 +5,7 @@ from maya import cmds
 from dwpicker.main import DwPicker, WINDOW_CONTROL_NAME
 from dwpicker.optionvar import ensure_optionvars_exists
 from dwpicker.namespace import detect_picker_namespace
+from dwpicker import profiling
 from dwpicker.qtutils import remove_workspace_control
 from dwpicker.updatechecker import warn_if_update_available
 
@@ -140,7 +141,10 @@ def current():
     """
     if not _dwpicker:
         return
-    return _dwpicker.tab.currentWidget()
+    picker = _dwpicker.tab.currentWidget()
+    if picker:
+        picker.materialize()
+    return picker
 
 
 def refresh():
@@ -206,3 +210,54 @@ def get_shape(shape_id):
     if not picker:
         return
     return picker.document.shapes_by_id.get(shape_id)
+
+
+def enable_profiling(state=True):
+    """
+    Enable the timing probes set around the picker hot paths (paint, hover,
+    selection synchronization, commands, scene data load and store).
+    """
+    profiling.enable_profiling(state)
+
+
+def profiling_statistics():
+    """
+    Return the timing statistics of each probe as:
+        {probe name: {'count': int, 'mean': ms, 'p95': ms, 'max': ms}}
+    """
+    return profiling.statistics()
+
+
+def reset_profiling():
+    profiling.reset_probes()
+
+
+def set_profiling_overlay_visible(visible=True):
+    """
+    Display the frame time and the count of shapes drawn and culled on top
+    of the picker panels.
+    """
+    profiling.set_overlay_visible(visible)
+    if not _dwpicker:
+        return
+    for picker in _dwpicker.pickers:
+        for panel in picker.pickers:
+            panel.update()
+
+
+def start_trace_recording():
+    """
+    Record the mouse, wheel and key events received by the pickers and the
+    editor canvases. The trace can be replayed with benchmarks.replay.
+    """
+    from dwpicker import trace
+    trace.start_recording()
+
+
+def stop_trace_recording(filename=None):
+    """
+    Stop the recording, save the trace if a filename is given and return
+    it.
+    """
+    from dwpicker import trace
+    return trace.stop_recording(filename)
@@ -1,11 +1,12 @@
 from functools import partial
 from dwpicker.pyside import QtCore, QtGui, QtWidgets
-from maya import cmds
 
 from dwpicker.align import align_shapes_on_line
+from dwpicker.imagecache import image_loader
 from dwpicker.interactive import Manipulator, SelectionSquare
 from dwpicker.interactionmanager import InteractionManager
-from dwpicker.optionvar import SNAP_GRID_X, SNAP_GRID_Y, SNAP_ITEMS
+from dwpicker.optionvar import (
+    SNAP_GRID_X, SNAP_GRID_Y, SNAP_ITEMS, get_optionvar)
 from dwpicker.geometry import get_shapes_bounding_rects, get_connection_path
 from dwpicker.painting import (
     draw_editor_canvas, draw_shape, draw_manipulator, draw_selection_square,
@@ -19,11 +20,11 @@ from dwpicker.viewport import ViewportMapper
 
 
 def load_saved_snap():
-    if not cmds.optionVar(query=SNAP_ITEMS):
+    if not get_optionvar(SNAP_ITEMS):
         return
     return (
-        cmds.optionVar(query=SNAP_GRID_X),
-        cmds.optionVar(query=SNAP_GRID_Y))
+        get_optionvar(SNAP_GRID_X),
+        get_optionvar(SNAP_GRID_Y))
 
 
 class ShapeEditCanvas(QtWidgets.QWidget):
@@ -42,6 +43,7 @@ class ShapeEditCanvas(QtWidgets.QWidget):
         self.document = document
         method = partial(self.update_selection, False)
         self.document.data_changed.connect(method)
+        image_loader().image_loaded.connect(self.image_loaded)
 
         self.drag_shapes = []
         self.viewportmapper = ViewportMapper()
@@ -341,6 +343,9 @@ class ShapeEditCanvas(QtWidgets.QWidget):
 
         self.update()
 
+    def image_loaded(self, *_):
+        self.update()
+
     def update_selection(self, changed=True):
         shapes = [s for s in self.selection if s in self.visible_shapes()]
         if shapes:
@@ -1,8 +1,7 @@
 
 from dwpicker.pyside import QtCore
-from maya import cmds
 from dwpicker.optionvar import (
-    ISOLATE_CURRENT_PANEL_SHAPES, DISPLAY_HIERARCHY_IN_CANVAS)
+    ISOLATE_CURRENT_PANEL_SHAPES, DISPLAY_HIERARCHY_IN_CANVAS, get_optionvar)
 
 
 class DisplayOptions(QtCore.QObject):
@@ -10,8 +9,8 @@ class DisplayOptions(QtCore.QObject):
 
     def __init__(self):
         super(DisplayOptions, self).__init__()
-        self.isolate = cmds.optionVar(query=ISOLATE_CURRENT_PANEL_SHAPES)
+        self.isolate = get_optionvar(ISOLATE_CURRENT_PANEL_SHAPES)
         self.current_panel = -1
         self.highlighted_children_ids = []
-        state = cmds.optionVar(query=DISPLAY_HIERARCHY_IN_CANVAS)
+        state = get_optionvar(DISPLAY_HIERARCHY_IN_CANVAS)
         self.display_hierarchy = bool(state)
\ No newline at end of file
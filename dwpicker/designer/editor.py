@@ -14,7 +14,8 @@ from dwpicker.dialog import (
 from dwpicker.geometry import (
     rect_symmetry, path_symmetry, get_shapes_bounding_rects,
     rect_top_left_symmetry)
-from dwpicker.optionvar import BG_LOCKED, TRIGGER_REPLACE_ON_MIRROR
+from dwpicker.optionvar import (
+    BG_LOCKED, TRIGGER_REPLACE_ON_MIRROR, get_optionvar)
 from dwpicker.path import format_path
 from dwpicker.qtutils import set_shortcut, get_cursor
 from dwpicker.shape import Shape, get_shape_rect_from_options
@@ -50,7 +51,7 @@ class PickerEditor(QtWidgets.QWidget):
         self.shape_canvas = ShapeEditCanvas(
             self.document, self.display_options)
         self.shape_canvas.callContextMenu.connect(self.call_context_menu)
-        bg_locked = bool(cmds.optionVar(query=BG_LOCKED))
+        bg_locked = bool(get_optionvar(BG_LOCKED))
         self.shape_canvas.set_lock_background_shape(bg_locked)
         self.shape_canvas.selectedShapesChanged.connect(self.selection_changed)
 
@@ -166,6 +167,7 @@ class PickerEditor(QtWidgets.QWidget):
         settings = {k: v for k, v in settings.items() if k in dialog.settings}
         for shape in self.shape_canvas.selection:
             shape.options.update(deepcopy(settings))
+            shape.invalidate_render_style()
             shape.rect = get_shape_rect_from_options(shape.options)
             shape.synchronize_image()
             shape.update_path()
@@ -213,6 +215,7 @@ class PickerEditor(QtWidgets.QWidget):
     def options_set(self, options, rect_update):
         for shape in self.shape_canvas.selection:
             shape.options.update(options)
+            shape.invalidate_render_style()
             if rect_update:
                 shape.rect = QtCore.QRectF(
                     options['shape.left'],
@@ -233,6 +236,7 @@ class PickerEditor(QtWidgets.QWidget):
 
         for shape in self.shape_canvas.selection:
             shape.options[option] = value
+            shape.invalidate_render_style()
             if option in ('shape.path', 'shape'):
                 if value == 'custom' and not shape.options['shape.path']:
                     update_selection = True
@@ -329,13 +333,13 @@ class PickerEditor(QtWidgets.QWidget):
             return
         targets = cmds.ls(selection=True)
         for shape in self.shape_canvas.selection:
-            shape.set_targets(targets)
+            self.document.set_shape_targets(shape, targets)
         self.shape_canvas.update()
         self.document.shapes_changed.emit()
         self.document.record_undo()
 
     def update_targets(self, shape):
-        shape.set_targets(cmds.ls(selection=True))
+        self.document.set_shape_targets(shape, cmds.ls(selection=True))
         self.shape_canvas.update()
         self.document.shapes_changed.emit()
         self.document.record_undo()
@@ -395,7 +399,7 @@ class PickerEditor(QtWidgets.QWidget):
                 shape.synchronize_rect()
         self.shape_canvas.update()
         self.document.shapes_changed.emit()
-        if not cmds.optionVar(query=TRIGGER_REPLACE_ON_MIRROR):
+        if not get_optionvar(TRIGGER_REPLACE_ON_MIRROR):
             self.document.record_undo()
             return
         if not self.search_and_replace():
@@ -433,7 +437,7 @@ class PickerEditor(QtWidgets.QWidget):
                     result = command['command'].replace(pattern, replace)
                     command['command'] = result
 
-        self.document.shape_changed.emit()
+        self.document.shapes_changed.emit()
         self.document.record_undo()
         self.shape_canvas.update()
         return True
@@ -1,10 +1,10 @@
 from functools import partial
-from maya import cmds
 from dwpicker.pyside import QtGui, QtWidgets, QtCore
 
 from dwpicker.optionvar import (
     BG_LOCKED, DISPLAY_HIERARCHY_IN_CANVAS, ISOLATE_CURRENT_PANEL_SHAPES,
-    SNAP_ITEMS, SNAP_GRID_X, SNAP_GRID_Y, save_optionvar)
+    SNAP_ITEMS, SNAP_GRID_X, SNAP_GRID_Y, get_optionvar,
+    save_optionvar)
 from dwpicker.qtutils import icon
 
 
@@ -85,7 +85,7 @@ class MenuWidget(QtWidgets.QWidget):
         self.hierarchy = QtWidgets.QAction(icon('hierarchy.png'), '', self)
         self.hierarchy.setToolTip('Display hierarchy')
         self.hierarchy.setCheckable(True)
-        state = bool(cmds.optionVar(query=DISPLAY_HIERARCHY_IN_CANVAS))
+        state = bool(get_optionvar(DISPLAY_HIERARCHY_IN_CANVAS))
         self.hierarchy.setChecked(state)
         self.hierarchy.toggled.connect(self.toggle_hierarchy_display)
 
@@ -250,13 +250,13 @@ class MenuWidget(QtWidgets.QWidget):
         self.buttonLibraryRequested.emit(point)
 
     def load_ui_states(self):
-        self.snap.setChecked(cmds.optionVar(query=SNAP_ITEMS))
-        value = str(cmds.optionVar(query=SNAP_GRID_X))
+        self.snap.setChecked(get_optionvar(SNAP_ITEMS))
+        value = str(get_optionvar(SNAP_GRID_X))
         self.snapx.setText(value)
-        value = str(cmds.optionVar(query=SNAP_GRID_Y))
+        value = str(get_optionvar(SNAP_GRID_Y))
         self.snapy.setText(value)
-        self.lock_bg.setChecked(bool(cmds.optionVar(query=BG_LOCKED)))
-        value = bool(cmds.optionVar(query=ISOLATE_CURRENT_PANEL_SHAPES))
+        self.lock_bg.setChecked(bool(get_optionvar(BG_LOCKED)))
+        value = bool(get_optionvar(ISOLATE_CURRENT_PANEL_SHAPES))
         self.isolate.setChecked(value)
 
     def save_ui_states(self):
@@ -4,7 +4,6 @@ from copy import deepcopy
 from functools import partial
 
 from dwpicker.pyside import QtWidgets, QtCore, QtGui
-from maya import cmds
 
 from dwpicker.geometry import (
     distance, get_global_rect, grow_rect, path_symmetry)
@@ -12,7 +11,8 @@ from dwpicker.qtutils import icon
 from dwpicker.interactionmanager import InteractionManager
 from dwpicker.interactive import SelectionSquare, Manipulator
 from dwpicker.optionvar import (
-    LAST_OPEN_DIRECTORY, SHAPE_PATH_ROTATION_STEP_ANGLE, save_optionvar)
+    LAST_OPEN_DIRECTORY, SHAPE_PATH_ROTATION_STEP_ANGLE, get_optionvar,
+    save_optionvar)
 from dwpicker.painting import (
     draw_selection_square, draw_manipulator, draw_tangents,
     draw_world_coordinates)
@@ -81,7 +81,7 @@ class PathEditor(QtWidgets.QWidget):
         self.angle_step.setToolTip('Step')
         self.angle_step.setMinimum(0)
         self.angle_step.setMaximum(90)
-        value = cmds.optionVar(query=SHAPE_PATH_ROTATION_STEP_ANGLE)
+        value = get_optionvar(SHAPE_PATH_ROTATION_STEP_ANGLE)
         self.angle_step.setValue(value)
         function = partial(save_optionvar, SHAPE_PATH_ROTATION_STEP_ANGLE)
         self.angle_step.valueChanged.connect(function)
@@ -6,10 +6,10 @@ from maya import cmds
 
 from dwpicker.designer.highlighter import get_highlighter
 from dwpicker.optionvar import (
-    save_optionvar, CHECK_FOR_UPDATE,
+    get_optionvar, save_optionvar, CHECK_FOR_UPDATE,
     SEARCH_FIELD_INDEX, LAST_IMAGE_DIRECTORY_USED, SETTINGS_GROUP_TO_COPY,
     SHAPES_FILTER_INDEX, SETTINGS_TO_COPY)
-from dwpicker.languages import MEL, PYTHON
+from dwpicker.languages import MEL, PYTHON, uncache_code
 from dwpicker.path import get_image_directory
 from dwpicker.qtutils import icon
 from dwpicker.namespace import selected_namespace
@@ -103,7 +103,7 @@ class SettingsPaster(QtWidgets.QDialog):
         self.setWindowTitle('Paste settings')
         self.groups = {}
         self.categories = {}
-        enable_settings = cmds.optionVar(query=SETTINGS_TO_COPY).split(';')
+        enable_settings = get_optionvar(SETTINGS_TO_COPY).split(';')
         for setting in sorted(BUTTON.keys()):
             text = ' '.join(setting.split('.')[1:]).capitalize()
             checkbox = QtWidgets.QCheckBox(text or setting.capitalize())
@@ -112,7 +112,7 @@ class SettingsPaster(QtWidgets.QDialog):
             checkbox.stateChanged.connect(self.updated)
             name = setting.split('.')[0]
             self.categories.setdefault(name, []).append(checkbox)
-        enable_groups = cmds.optionVar(query=SETTINGS_GROUP_TO_COPY).split(';')
+        enable_groups = get_optionvar(SETTINGS_GROUP_TO_COPY).split(';')
 
         groups_layout = QtWidgets.QVBoxLayout()
         self.group_layouts = QtWidgets.QHBoxLayout()
@@ -170,12 +170,12 @@ class SearchAndReplaceDialog(QtWidgets.QDialog):
 
         self.filters = QtWidgets.QComboBox()
         self.filters.addItems(SHAPES_FILTERS)
-        self.filters.setCurrentIndex(cmds.optionVar(query=SHAPES_FILTER_INDEX))
+        self.filters.setCurrentIndex(get_optionvar(SHAPES_FILTER_INDEX))
         function = partial(save_optionvar, SHAPES_FILTER_INDEX)
         self.filters.currentIndexChanged.connect(function)
         self.fields = QtWidgets.QComboBox()
         self.fields.addItems(SEARCH_AND_REPLACE_FIELDS)
-        self.fields.setCurrentIndex(cmds.optionVar(query=SEARCH_FIELD_INDEX))
+        self.fields.setCurrentIndex(get_optionvar(SEARCH_FIELD_INDEX))
         function = partial(save_optionvar, SEARCH_FIELD_INDEX)
         self.fields.currentIndexChanged.connect(function)
         self.search = QtWidgets.QLineEdit()
@@ -351,7 +351,7 @@ class UpdateAvailableDialog(QtWidgets.QDialog):
         self.check_cb = QtWidgets.QCheckBox('Check for update at startup')
         self.check_cb.stateChanged.connect(
             self.change_check_for_update_preference)
-        self.check_cb.setChecked(cmds.optionVar(query=CHECK_FOR_UPDATE))
+        self.check_cb.setChecked(get_optionvar(CHECK_FOR_UPDATE))
 
         # Layouts
         button_layout = QtWidgets.QHBoxLayout()
@@ -377,6 +377,7 @@ class CommandEditorDialog(QtWidgets.QDialog):
     def __init__(self, command, parent=None):
         super(CommandEditorDialog, self).__init__(parent)
         self.setWindowTitle('Edit/Create command')
+        self.original_command = command
         self.languages = QtWidgets.QComboBox()
         self.languages.addItems([MEL, PYTHON])
         self.languages.setCurrentText(command['language'])
@@ -443,6 +444,14 @@ class CommandEditorDialog(QtWidgets.QDialog):
     def sizeHint(self):
         return QtCore.QSize(400, 550)
 
+    def accept(self):
+        # The previous code is not executed anymore, drop its compiled
+        # version.
+        uncache_code(
+            self.original_command['language'],
+            self.original_command['command'])
+        super(CommandEditorDialog, self).accept()
+
     def language_changed(self, *_):
         language = self.languages.currentText()
         highlighter = get_highlighter(language)
@@ -465,6 +474,7 @@ class MenuCommandEditorDialog(QtWidgets.QDialog):
     def __init__(self, command, parent=None):
         super(MenuCommandEditorDialog, self).__init__(parent)
         self.setWindowTitle('Edit/Create command')
+        self.original_command = command
         self.languages = QtWidgets.QComboBox()
         self.languages.addItems([MEL, PYTHON])
         self.languages.setCurrentText(command['language'])
@@ -517,6 +527,14 @@ class MenuCommandEditorDialog(QtWidgets.QDialog):
     def sizeHint(self):
         return QtCore.QSize(400, 550)
 
+    def accept(self):
+        # The previous code is not executed anymore, drop its compiled
+        # version.
+        uncache_code(
+            self.original_command['language'],
+            self.original_command['command'])
+        super(MenuCommandEditorDialog, self).accept()
+
     def language_changed(self, *_):
         language = self.languages.currentText()
         highlighter = get_highlighter(language)
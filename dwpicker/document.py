@@ -2,44 +2,178 @@
 import uuid
 from copy import deepcopy
 from collections import defaultdict
+from itertools import count
 from dwpicker.pyside import QtCore
 from dwpicker.shape import Shape
+from dwpicker.spatialindex import SpatialIndex
 from dwpicker.templates import PICKER
-from dwpicker.undo import UndoManager
+from dwpicker.undo import UndoManager, modified_shape_keys, target_changes
 from dwpicker.stack import count_panels
 
 
+# Shared by all the documents, a revision identifies a document state.
+REVISIONS = count()
+
+
 class PickerDocument(QtCore.QObject):
     shapes_changed = QtCore.Signal()
     # origin: str ["editor"|"picker"], key: str
     general_option_changed = QtCore.Signal(str, str)
     data_changed = QtCore.Signal()
     changed = QtCore.Signal()
+    # added: set, removed: set (nodes newly targeted or no longer targeted)
+    targets_changed = QtCore.Signal(object, object)
 
-    def __init__(self, data):
+    def __init__(self, data, lazy=False):
+        """
+        lazy: the shapes and the undo history are only built when the shapes
+        are accessed the first time.
+        """
         super(PickerDocument, self).__init__()
         self.data = data
         self.filename = None
         self.modified_state = False
-        self.undo_manager = UndoManager(self.data)
+        self.revision = next(REVISIONS)
+        self._undo_manager = None
 
-        self.shapes = []
-        self.shapes_by_panel = {}
-        self.shapes_by_id = {}
-        self.shapes_by_layer = {}
-        self.generate_shapes()
+        self._shapes = None
+        self._shapes_by_panel = {}
+        self._shapes_by_id = {}
+        self._shapes_by_layer = {}
+        self.spatial_indexes = {}
+        self.shape_ids_by_target = None
+        self.shapes_by_image_path = None
+        self._target_counts = None
+        if not lazy:
+            self.load()
 
+        # Connected first to be updated before the changed listeners.
+        self.changed.connect(self.update_revision)
+        self.shapes_changed.connect(self.invalidate_spatial_indexes)
+        self.shapes_changed.connect(self.invalidate_targets_index)
+        self.shapes_changed.connect(self.invalidate_images_index)
         self.shapes_changed.connect(self.emit_change)
         self.general_option_changed.connect(self.emit_change)
+        self.data_changed.connect(self.invalidate_render_styles)
         self.data_changed.connect(self.emit_change)
         self.shapes_changed.connect(self.emit_change)
 
+    @property
+    def loaded(self):
+        return self._shapes is not None
+
+    def load(self):
+        # The undo snapshot has to be taken before any modification.
+        if self._undo_manager is None:
+            self._undo_manager = UndoManager(self.data)
+        if self._shapes is None:
+            self.generate_shapes()
+
+    @property
+    def undo_manager(self):
+        self.load()
+        return self._undo_manager
+
+    @property
+    def shapes(self):
+        self.load()
+        return self._shapes
+
+    @shapes.setter
+    def shapes(self, shapes):
+        self._shapes = shapes
+
+    @property
+    def shapes_by_panel(self):
+        self.load()
+        return self._shapes_by_panel
+
+    @shapes_by_panel.setter
+    def shapes_by_panel(self, shapes_by_panel):
+        self._shapes_by_panel = shapes_by_panel
+
+    @property
+    def shapes_by_id(self):
+        self.load()
+        return self._shapes_by_id
+
+    @shapes_by_id.setter
+    def shapes_by_id(self, shapes_by_id):
+        self._shapes_by_id = shapes_by_id
+
+    @property
+    def shapes_by_layer(self):
+        self.load()
+        return self._shapes_by_layer
+
+    @shapes_by_layer.setter
+    def shapes_by_layer(self, shapes_by_layer):
+        self._shapes_by_layer = shapes_by_layer
+
+    def list_targets(self):
+        """
+        All the nodes targeted by the document, read from the data to not
+        build the shapes.
+        """
+        return set(self.target_counts())
+
+    def target_counts(self):
+        """
+        Node name -> number of shapes targeting it. Once built, it is updated
+        from the recorded changes and targets_changed is emitted when a
+        node gets its first shape or loses its last one.
+        """
+        if self._target_counts is None:
+            self._target_counts = defaultdict(int)
+            for options in self.data['shapes']:
+                for target in options['action.targets']:
+                    self._target_counts[target] += 1
+        return self._target_counts
+
+    def update_target_counts(self, changes):
+        if self._target_counts is None:
+            return
+        added, removed = set(), set()
+        for target, difference in changes.items():
+            count = self._target_counts.get(target, 0)
+            new_count = count + difference
+            if new_count > 0:
+                self._target_counts[target] = new_count
+                if not count:
+                    added.add(target)
+            else:
+                self._target_counts.pop(target, None)
+                if count:
+                    removed.add(target)
+        if added or removed:
+            self.targets_changed.emit(added, removed)
+
+    def recount_targets(self):
+        # Used after undo and redo, the deltas they return can mix both
+        # directions.
+        if self._target_counts is None:
+            return
+        old_targets = set(self._target_counts)
+        self._target_counts = None
+        targets = self.list_targets()
+        if targets != old_targets:
+            self.targets_changed.emit(
+                targets - old_targets, old_targets - targets)
+
     def emit_change(self, *_):
         """
         Signal allways emitted when any data of the model changed.
         """
         self.changed.emit()
 
+    def update_revision(self, *_):
+        """
+        Give a new revision to the document, the data stored in the scene is
+        only encoded again for the documents with a new revision (see
+        scenedata.store_picker_data_chunks).
+        """
+        self.revision = next(REVISIONS)
+
     @staticmethod
     def create():
         data = {
@@ -48,20 +182,27 @@ class PickerDocument(QtCore.QObject):
         return PickerDocument(data)
 
     def record_undo(self):
-        self.undo_manager.set_data_modified(self.data)
+        # Targets can be edited directly through the shape options.
+        self.invalidate_targets_index()
+        delta = self.undo_manager.set_data_modified(self.data)
+        if delta:
+            self.update_target_counts(target_changes(delta))
         self.modified_state = True
+        self.update_revision()
 
     def undo(self):
-        if self.undo_manager.undo():
-            self.data = self.undo_manager.data
-            self.generate_shapes()
+        deltas = self.undo_manager.undo(self.data)
+        if deltas:
+            self.sync_shapes_with_data(modified_shape_keys(deltas))
+            self.recount_targets()
             self.data_changed.emit()
             self.modified_state = True
 
     def redo(self):
-        if self.undo_manager.redo():
-            self.data = self.undo_manager.data
-            self.generate_shapes()
+        deltas = self.undo_manager.redo(self.data)
+        if deltas:
+            self.sync_shapes_with_data(modified_shape_keys(deltas))
+            self.recount_targets()
             self.data_changed.emit()
             self.modified_state = True
 
@@ -70,12 +211,32 @@ class PickerDocument(QtCore.QObject):
 
     def set_shapes_data(self, data):
         self.data['shapes'] = data
-        self.generate_shapes()
+        self.sync_shapes_with_data()
 
     def generate_shapes(self):
         self.shapes = [Shape(options) for options in self.data['shapes']]
         self.sync_shapes_caches()
 
+    def sync_shapes_with_data(self, modified_keys=None):
+        """
+        Update the shapes list after the shapes data list changed (reorder,
+        undo...). The existing Shape objects are kept when their options are
+        still in the data, only the new options get a new Shape.
+        modified_keys: {shape id: option names} of the options modified in
+        place, those shapes are resynchronized.
+        """
+        modified_keys = modified_keys or {}
+        shapes = []
+        for options in self.data['shapes']:
+            shape = self.shapes_by_id.get(options['id'])
+            if shape is None or shape.options is not options:
+                shape = Shape(options)
+            elif options['id'] in modified_keys:
+                shape.synchronize_options(modified_keys[options['id']])
+            shapes.append(shape)
+        self.shapes = shapes
+        self.sync_shapes_caches()
+
     def sync_shapes_caches(self):
         self.shapes_by_panel = defaultdict(list)
         self.shapes_by_id = {}
@@ -86,6 +247,75 @@ class PickerDocument(QtCore.QObject):
             layer = shape.options['visibility_layer']
             if layer:
                 self.shapes_by_layer[layer].append(shape)
+        self.invalidate_spatial_indexes()
+        self.invalidate_targets_index()
+        self.invalidate_images_index()
+
+    def invalidate_render_styles(self):
+        # Whole data changes only (undo, redo). The editors invalidate the
+        # style of the shapes they modify.
+        for shape in self._shapes or []:
+            shape.invalidate_render_style()
+
+    def invalidate_spatial_indexes(self):
+        self.spatial_indexes = {}
+
+    def spatial_index(self, panel):
+        """
+        Return the panel hit-test index. It is built on demand and dropped
+        each time the shapes are modified.
+        """
+        if panel not in self.spatial_indexes:
+            shapes = self.shapes_by_panel.get(panel, [])
+            self.spatial_indexes[panel] = SpatialIndex(shapes)
+        return self.spatial_indexes[panel]
+
+    def invalidate_targets_index(self):
+        self.shape_ids_by_target = None
+
+    def targets_index(self):
+        """
+        Inverted index: maya node name -> ids of the shapes targeting it.
+        """
+        if self.shape_ids_by_target is None:
+            self.shape_ids_by_target = defaultdict(set)
+            for shape in self.shapes:
+                for target in shape.targets():
+                    self.shape_ids_by_target[target].add(shape.options['id'])
+        return self.shape_ids_by_target
+
+    def shapes_from_targets(self, targets):
+        index = self.targets_index()
+        ids = {id_ for target in targets for id_ in index.get(target, ())}
+        return [
+            self.shapes_by_id[id_] for id_ in ids if id_ in self.shapes_by_id]
+
+    def invalidate_images_index(self):
+        self.shapes_by_image_path = None
+
+    def shapes_from_image(self, image):
+        """
+        Return the shapes displaying the given CachedImage. The shapes are
+        indexed by image path: the image of a shape can be replaced (resize)
+        but its path only changes with the shapes options.
+        """
+        if self.shapes_by_image_path is None:
+            self.shapes_by_image_path = defaultdict(list)
+            for shape in self.shapes:
+                if shape.image is not None and shape.image.path:
+                    path = shape.image.path
+                    self.shapes_by_image_path[path].append(shape)
+        shapes = self.shapes_by_image_path.get(image.path, [])
+        return [s for s in shapes if s.image is image]
+
+    def set_shape_targets(self, shape, targets):
+        if self.shape_ids_by_target is not None:
+            id_ = shape.options['id']
+            for target in shape.targets():
+                self.shape_ids_by_target[target].discard(id_)
+            for target in targets:
+                self.shape_ids_by_target[target].add(id_)
+        shape.set_targets(targets)
 
     def add_shapes(self, shapes_data, prepend=False, hierarchize=False):
         for options in shapes_data:
@@ -105,18 +335,53 @@ class PickerDocument(QtCore.QObject):
             for shape in reversed(shapes):
                 self.shapes.insert(0, shape)
                 self.data['shapes'].insert(0, shape.options)
+                self.register_shape(shape, prepend=True)
         else:
             self.shapes.extend(shapes)
             self.data['shapes'].extend(shapes_data)
+            for shape in shapes:
+                self.register_shape(shape)
 
-        self.sync_shapes_caches()
         return shapes
 
+    def register_shape(self, shape, prepend=False):
+        """
+        Add a new shape to the caches without rebuilding them.
+        """
+        index = 0 if prepend else None
+        options = shape.options
+        self.shapes_by_id[options['id']] = shape
+        insert(self.shapes_by_panel[options['panel']], shape, index)
+        if options['visibility_layer']:
+            layer = options['visibility_layer']
+            insert(self.shapes_by_layer[layer], shape, index)
+        self.spatial_indexes.pop(options['panel'], None)
+        self.invalidate_images_index()
+        if self.shape_ids_by_target is not None:
+            for target in shape.targets():
+                self.shape_ids_by_target[target].add(options['id'])
+
     def remove_shapes(self, shapes):
-        removed_ids = [shape.options['id'] for shape in shapes]
+        removed_ids = {shape.options['id'] for shape in shapes}
         self.data['shapes'] = [
             s for s in self.data['shapes'] if s['id'] not in removed_ids]
-        self.generate_shapes()
+        self.shapes = [
+            s for s in self.shapes if s.options['id'] not in removed_ids]
+
+        for cache in (self.shapes_by_panel, self.shapes_by_layer):
+            for key, cached_shapes in cache.items():
+                cache[key] = [
+                    s for s in cached_shapes
+                    if s.options['id'] not in removed_ids]
+        for shape in shapes:
+            id_ = shape.options['id']
+            self.shapes_by_id.pop(id_, None)
+            self.spatial_indexes.pop(shape.options['panel'], None)
+            self.invalidate_images_index()
+            if self.shape_ids_by_target is None:
+                continue
+            for target in shape.targets():
+                self.shape_ids_by_target[target].discard(id_)
 
     def all_children(self, id_):
         if id_ not in self.shapes_by_id:
@@ -141,4 +406,11 @@ class PickerDocument(QtCore.QObject):
                 children = shape.options.get('children', [])
                 to_visit.extend(c for c in children if c not in visited)
 
-        return result
\ No newline at end of file
+        return result
+
+
+def insert(shapes, shape, index=None):
+    if index is None:
+        shapes.append(shape)
+        return
+    shapes.insert(index, shape)
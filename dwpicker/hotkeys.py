@@ -1,6 +1,6 @@
 
-from maya import cmds
-from dwpicker.optionvar import save_optionvar, DEFAULT_HOTKEYS, OPTIONVARS
+from dwpicker.optionvar import (
+    get_optionvar, save_optionvar, DEFAULT_HOTKEYS, OPTIONVARS)
 
 
 def get_hotkeys_config():
@@ -8,7 +8,7 @@ def get_hotkeys_config():
     # set in case of new shortcut added in the system. We also ensure that old
     # shortcut is going to be removed from the config.
     default = build_config_from_string(OPTIONVARS[DEFAULT_HOTKEYS])
-    saved = build_config_from_string(cmds.optionVar(query=DEFAULT_HOTKEYS))
+    saved = build_config_from_string(get_optionvar(DEFAULT_HOTKEYS))
     for key in default.keys():
         if key in saved:
             default[key] = saved[key]
@@ -0,0 +1,273 @@
+import os
+import weakref
+from collections import OrderedDict
+from dwpicker.pyside import QtCore, QtGui
+from dwpicker.path import expand_path
+
+
+# Rough estimation (in bytes) of the memory the decoded images can use.
+MAX_CACHE_MEMORY = 512 * 1024 * 1024
+# Smallest size of the reduced images (see CachedImage).
+MIN_LEVEL_SIZE = 64
+
+
+def pixmap_memory(pixmap):
+    return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+def size_bucket(size):
+    """
+    Round the largest side of the requested size to the next power of two.
+    Shapes showing the same image at close sizes share the decoded image.
+    """
+    if size is None:
+        return None
+    bucket = MIN_LEVEL_SIZE
+    while bucket < max(size.width(), size.height()):
+        bucket *= 2
+    return bucket
+
+
+def decode_image(path, bucket=None):
+    """
+    Read the image and build its pyramid (see CachedImage). This only uses
+    QImage and can be run outside of the main thread.
+    bucket: maximum size of the image largest side. The image is decoded
+    at this size directly if it is bigger.
+    """
+    reader = QtGui.QImageReader(path)
+    size = reader.size()
+    largest_side = max(size.width(), size.height())
+    if bucket and size.isValid() and largest_side > bucket:
+        factor = float(bucket) / largest_side
+        reader.setScaledSize(QtCore.QSize(
+            max(1, int(size.width() * factor)),
+            max(1, int(size.height() * factor))))
+    image = reader.read()
+    if image.isNull():
+        return []
+    levels = [image]
+    while min(image.width(), image.height()) // 2 >= MIN_LEVEL_SIZE:
+        image = image.scaled(
+            image.width() // 2, image.height() // 2,
+            QtCore.Qt.IgnoreAspectRatio,
+            QtCore.Qt.SmoothTransformation)
+        levels.append(image)
+    return levels
+
+
+class CachedImage():
+    """
+    Decoded image with a pyramid of reduced copies (each level is half the
+    size of the previous one). Painting a large image zoomed out picks a
+    small level instead of filtering the full resolution at each paint.
+    The image is decoded in background, it stays null while pending. It is
+    released when evicted from the cache and decoded again when painted.
+    """
+    def __init__(self, path=None, key=None):
+        self.path = path
+        self.key = key
+        self.pixmap = QtGui.QPixmap()
+        self.levels = [self.pixmap]
+        self.pending = False
+        self.released = False
+
+    def set_images(self, images):
+        self.pending = False
+        self.released = False
+        if not images:
+            return
+        self.levels = [QtGui.QPixmap.fromImage(image) for image in images]
+        self.pixmap = self.levels[0]
+
+    def release(self):
+        self.pixmap = QtGui.QPixmap()
+        self.levels = [self.pixmap]
+        self.released = True
+
+    def is_null(self):
+        return self.pixmap.isNull()
+
+    def memory(self):
+        return sum(pixmap_memory(level) for level in self.levels)
+
+    def pixmap_for_size(self, width, height):
+        """
+        Return the smallest level which is still bigger than the given size.
+        """
+        for level in reversed(self.levels):
+            if level.width() >= width and level.height() >= height:
+                return level
+        return self.pixmap
+
+
+class ImageDecodeTask(QtCore.QRunnable):
+    def __init__(self, image, loader):
+        super(ImageDecodeTask, self).__init__()
+        self.path = image.path
+        self.key = image.key
+        self.loader = loader
+
+    def run(self):
+        # Emitted from the worker thread, the signal is queued to the
+        # main thread where the pixmaps are created.
+        images = decode_image(self.path, self.key[2])
+        self.loader.decoded.emit(self.key, images)
+
+
+class ImageLoader(QtCore.QObject):
+    decoded = QtCore.Signal(object, object)
+    # CachedImage
+    image_loaded = QtCore.Signal(object)
+
+    def __init__(self, callback):
+        super(ImageLoader, self).__init__()
+        self.callback = callback
+        # The loader is a QObject living in the main thread, connecting to
+        # its own method ensures the callback is called in the main thread.
+        self.decoded.connect(self.call)
+
+    def call(self, key, images):
+        self.callback(key, images)
+
+
+class ImageCache():
+    """
+    Process wide image cache, shared by all the shapes and pickers.
+    Images are keyed by expanded path, modification time and size bucket,
+    so an image modified on disk is reloaded.
+    The images are ordered by last use (paint). When the memory budget is
+    exceeded, the least recently painted ones (e.g. the images of the tabs
+    hidden for a while) are released. The images painted in the current or
+    the last frame are never released: they are displayed and would be
+    decoded again at the next paint.
+    """
+    def __init__(self, budget=MAX_CACHE_MEMORY):
+        self.budget = budget
+        self.images = OrderedDict()
+        self.memory = 0
+        self.pending = {}
+        # Images evicted but still held by shapes. A new get() returns the
+        # same object, so a key is never decoded in two CachedImage.
+        self.released = weakref.WeakValueDictionary()
+        # Keys of the images painted in the current and the last frame. A
+        # frame ends when the event loop is back (after the paint events).
+        self.frame_keys = set()
+        self.last_frame_keys = set()
+        self.frame_pending = False
+        self._null_image = None
+        self._loader = None
+
+    @property
+    def null_image(self):
+        if self._null_image is None:
+            self._null_image = CachedImage()
+        return self._null_image
+
+    @property
+    def loader(self):
+        if self._loader is None:
+            self._loader = ImageLoader(self.image_decoded)
+        return self._loader
+
+    def get(self, path, size=None):
+        if not path:
+            return self.null_image
+        path = expand_path(path)
+        try:
+            key = path, os.path.getmtime(path), size_bucket(size)
+        except OSError:
+            return self.null_image
+
+        image = self.pending.get(key) or self.images.get(key)
+        if image is not None:
+            return image
+        image = self.released.pop(key, None) or CachedImage(path, key)
+        self.load(image)
+        return image
+
+    def load(self, image):
+        self.released.pop(image.key, None)
+        image.pending = True
+        self.pending[image.key] = image
+        task = ImageDecodeTask(image, self.loader)
+        QtCore.QThreadPool.globalInstance().start(task)
+
+    def use(self, image):
+        """
+        Mark the image as recently used, reload it if it was released.
+        """
+        self.frame_keys.add(image.key)
+        if not self.frame_pending:
+            self.frame_pending = True
+            QtCore.QTimer.singleShot(0, self.end_frame)
+        if image.released and not image.pending:
+            self.load(image)
+            return
+        if image.key in self.images:
+            # Re-inserted at the end to be the most recently used.
+            self.images[image.key] = self.images.pop(image.key)
+
+    def image_decoded(self, key, images):
+        image = self.pending.pop(key, None)
+        if image is None:
+            return
+        image.set_images(images)
+        if not image.is_null():
+            self.images[key] = image
+            self.memory += image.memory()
+            self.evict()
+        self.loader.image_loaded.emit(image)
+
+    def end_frame(self):
+        self.frame_pending = False
+        self.last_frame_keys = self.frame_keys
+        self.frame_keys = set()
+        # The images pinned by the previous frame can be released now.
+        self.evict()
+
+    def evict(self):
+        if self.memory <= self.budget:
+            return
+        pinned = self.frame_keys | self.last_frame_keys
+        for key in list(self.images):
+            if self.memory <= self.budget:
+                return
+            if key in pinned:
+                continue
+            image = self.images.pop(key)
+            self.memory -= image.memory()
+            image.release()
+            self.released[key] = image
+
+    def clear(self):
+        for key, image in self.images.items():
+            image.release()
+            self.released[key] = image
+        self.images = OrderedDict()
+        self.memory = 0
+
+
+_cache = ImageCache()
+
+
+def get_image(path, size=None):
+    """
+    Return the CachedImage of the given path. If the image isn't decoded
+    yet, it is loaded in background and image_loader().image_loaded is
+    emitted once ready.
+    size: maximum size the image can be displayed at.
+    """
+    return _cache.get(path, size)
+
+
+def use_image(image):
+    _cache.use(image)
+
+
+def image_loader():
+    return _cache.loader
+
+
+def clear_image_cache():
+    _cache.clear()
@@ -1,6 +1,5 @@
 from dwpicker.pyside import QtWidgets, QtCore
-from maya import cmds
-from dwpicker.optionvar import ZOOM_BUTTON
+from dwpicker.optionvar import ZOOM_BUTTON, get_optionvar
 
 
 class InteractionManager:
@@ -78,7 +77,7 @@ class InteractionManager:
 
     @property
     def zoom_button_pressed(self):
-        button = cmds.optionVar(query=ZOOM_BUTTON)
+        button = get_optionvar(ZOOM_BUTTON)
         return any((
             button == 'left' and self.left_click_pressed,
             button == 'middle' and self.middle_click_pressed,
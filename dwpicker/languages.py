@@ -1,18 +1,10 @@
-from copy import deepcopy
+from functools import partial
 
 PYTHON = 'python'
 MEL = 'mel'
-
-
-PYTHON_TARGETS_VARIABLE = """\
-import dwpicker
-__targets__ = [{targets}]
-if dwpicker.get_shape('{shape_id}'):
-    __shape__ = dwpicker.get_shape('{shape_id}').options
-else:
-    __shape__ = None
-{code}
-"""
+CODE_FILENAME = '<dwpicker command>'
+# Maximum number of compiled commands kept in memory.
+MAX_COMPILED_CODES = 256
 
 
 MEL_TARGETS_VARIABLE = """\
@@ -21,21 +13,9 @@ string $targets[] = {{{targets}}};
 """
 
 
-DEFERRED_PYTHON = """\
-from maya import cmds
-cmds.evalDeferred(\"\"\"{code}\"\"\", lowestPriority=True)
-"""
-
 DEFERRED_MEL = """\
 evalDeferred "{code}" -lowestPriority;"""
 
-STACK_UNDO_PYTHON = """\
-from maya import cmds
-cmds.undoInfo(openChunk=True)
-{code}
-cmds.undoInfo(closeChunk=True)
-"""
-
 STACK_UNDO_MEL = """\
 undoInfo -openChunk;
 {code}
@@ -54,18 +34,58 @@ def execute_code(
     return EXECUTORS[language](code, shape, deferred, compact_undo)
 
 
+_compiled_codes = {}
+
+
+def compile_code(language, code):
+    """
+    Return the code object of the command, it is only compiled on its first
+    execution.
+    """
+    key = language, code
+    if key not in _compiled_codes:
+        if len(_compiled_codes) >= MAX_COMPILED_CODES:
+            _compiled_codes.clear()
+        _compiled_codes[key] = compile(code, CODE_FILENAME, 'exec')
+    return _compiled_codes[key]
+
+
+def uncache_code(language, code):
+    _compiled_codes.pop((language, code), None)
+
+
+def clear_code_cache():
+    _compiled_codes.clear()
+
+
 def execute_python(
         code, shape=None, deferred=False, compact_undo=False):
-    if compact_undo:
-        code = STACK_UNDO_PYTHON.format(code=code)
+    import dwpicker
+    code = compile_code(PYTHON, code)
+    namespace = {
+        '__name__': '__main__',
+        '__targets__': (shape.targets() or []) if shape else [],
+        '__shape__': shape.options if shape else None,
+        'dwpicker': dwpicker}
     if deferred:
-        code = DEFERRED_PYTHON.format(code=code)
-    targets = (shape.targets() or []) if shape else []
-    targets = ', '.join(('"{}"'.format(target) for target in targets))
-    shape_id = shape.options['id'] if shape else None
-    code = PYTHON_TARGETS_VARIABLE.format(
-        targets=targets, shape_id=shape_id, code=code)
-    exec(code, globals())
+        from maya import cmds
+        cmds.evalDeferred(
+            partial(run_python, code, namespace, compact_undo),
+            lowestPriority=True)
+        return
+    run_python(code, namespace, compact_undo)
+
+
+def run_python(code, namespace, compact_undo=False):
+    if not compact_undo:
+        exec(code, namespace)
+        return
+    from maya import cmds
+    cmds.undoInfo(openChunk=True)
+    try:
+        exec(code, namespace)
+    finally:
+        cmds.undoInfo(closeChunk=True)
 
 
 def execute_mel(code, shape=None, deferred=False, compact_undo=False):
@@ -2,6 +2,7 @@
 import os
 import json
 import webbrowser
+from collections import defaultdict
 from copy import deepcopy
 from functools import partial
 
@@ -14,13 +15,11 @@ from dwpicker.appinfos import (
     VERSION, RELEASE_DATE, DW_GITHUB, DW_WEBSITE, PICKER_DOCUMENTATION)
 from dwpicker.compatibility import ensure_retro_compatibility
 from dwpicker.document import PickerDocument
-from dwpicker.designer.editor import PickerEditor
 from dwpicker.dialog import (
     question, get_image_path, NamespaceDialog)
-from dwpicker.ingest import animschool, mgear
 from dwpicker.hotkeys import get_hotkeys_config
 from dwpicker.namespace import (
-    switch_namespace, selected_namespace, detect_picker_namespace,
+    switch_namespace, selected_namespace, detect_targets_namespace,
     pickers_namespaces)
 from dwpicker.optionvar import (
     AUTO_FOCUS_BEHAVIOR, AUTO_SWITCH_TAB, AUTO_RESIZE_NAMESPACE_COMBO,
@@ -28,17 +27,18 @@ from dwpicker.optionvar import (
     DISPLAY_HIERARCHY_IN_PICKER, DISPLAY_QUICK_OPTIONS,
     INSERT_TAB_AFTER_CURRENT, LAST_OPEN_DIRECTORY, LAST_IMPORT_DIRECTORY,
     LAST_SAVE_DIRECTORY, NAMESPACE_TOOLBAR, USE_ICON_FOR_UNSAVED_TAB,
-    WARN_ON_TAB_CLOSED, save_optionvar, append_recent_filename,
-    save_opened_filenames)
+    WARN_ON_TAB_CLOSED, get_optionvar, save_optionvar,
+    append_recent_filename, save_opened_filenames)
 from dwpicker.path import get_import_directory, get_open_directory, format_path
-from dwpicker.picker import PickerStackedView, list_targets
-from dwpicker.preference import PreferencesWindow
+from dwpicker.picker import PickerStackedView
 from dwpicker.qtutils import set_shortcut, icon, maya_main_window, DockableBase
 from dwpicker.quick import QuickOptions
 from dwpicker.references import ensure_images_path_exists
 from dwpicker.scenedata import (
     load_local_picker_data, store_local_picker_data,
-    clean_stray_picker_holder_nodes)
+    clean_stray_picker_holder_nodes, list_picker_holder_nodes, holder_nodes,
+    HolderNodeSet, PICKER_HOLDER_NODE)
+from dwpicker.selectiondispatcher import dispatcher
 from dwpicker.templates import PICKER, BACKGROUND
 
 
@@ -93,11 +93,14 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         self.stored_focus = None
         self.editors = []
         self.pickers = []
-        self.preferences_window = PreferencesWindow(
-            callback=self.load_ui_states, parent=maya_main_window())
-        self.preferences_window.need_update_callbacks.connect(
-            self.reload_callbacks)
-        self.preferences_window.hotkey_changed.connect(self.register_shortcuts)
+        # Holder nodes already read, used to only load the new ones when a
+        # file is imported or referenced.
+        self.loaded_holder_nodes = HolderNodeSet()
+        # Maya node -> pickers targeting it. Auto tab switching looks up
+        # the selection here instead of listing the targets of each picker.
+        self.pickers_by_target = defaultdict(list)
+        self.targets_by_picker = {}
+        self._preferences_window = None
 
         self.sub_panels_view = QtWidgets.QToolButton()
         self.sub_panels_view.setCheckable(True)
@@ -240,8 +243,23 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
             closeCallback=CLOSE_CALLBACK_COMMAND, *args, **kwargs)
         self.register_callbacks()
 
+    @property
+    def preferences_window(self):
+        # The preferences, the editor and the ingest modules are imported
+        # on first use to speed up the picker startup.
+        if self._preferences_window is None:
+            from dwpicker.preference import PreferencesWindow
+            self._preferences_window = PreferencesWindow(
+                callback=self.load_ui_states, parent=maya_main_window())
+            self._preferences_window.need_update_callbacks.connect(
+                self.reload_callbacks)
+            self._preferences_window.hotkey_changed.connect(
+                self.register_shortcuts)
+        return self._preferences_window
+
     def close_event(self):
-        self.preferences_window.close()
+        if self._preferences_window is not None:
+            self._preferences_window.close()
 
     def list_scene_namespaces(self):
         if self.list_namespaces_function:
@@ -262,7 +280,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         self.namespace_combo.blockSignals(False)
 
         # Auto update namespace combo to namespace size.
-        if not cmds.optionVar(query=AUTO_RESIZE_NAMESPACE_COMBO):
+        if not get_optionvar(AUTO_RESIZE_NAMESPACE_COMBO):
             self.namespace_combo.setSizePolicy(
                 QtWidgets.QSizePolicy.MinimumExpanding,
                 QtWidgets.QSizePolicy.Minimum)
@@ -283,7 +301,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         self.setFocus()
 
     def toggle_hierarchy_display(self):
-        state = not bool(cmds.optionVar(query=DISPLAY_HIERARCHY_IN_PICKER))
+        state = not bool(get_optionvar(DISPLAY_HIERARCHY_IN_PICKER))
         save_optionvar(DISPLAY_HIERARCHY_IN_PICKER, int(state))
         self.update()
         self.setFocus()
@@ -308,7 +326,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         self.panel_buttons.button(index).setChecked(True)
         if not picker:
             return
-        namespace = detect_picker_namespace(picker.document.shapes)
+        namespace = detect_targets_namespace(picker.document.list_targets())
         self.namespace_combo.blockSignals(True)
         if self.namespace_combo.findText(namespace) == -1 and namespace:
             self.namespace_combo.addItem(namespace)
@@ -326,13 +344,13 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         self.store_local_pickers_data()
 
     def leaveEvent(self, _):
-        mode = cmds.optionVar(query=AUTO_FOCUS_BEHAVIOR)
+        mode = get_optionvar(AUTO_FOCUS_BEHAVIOR)
         if mode == 'off':
             return
         cmds.setFocus("MayaWindow")
 
     def enterEvent(self, _):
-        mode = cmds.optionVar(query=AUTO_FOCUS_BEHAVIOR)
+        mode = get_optionvar(AUTO_FOCUS_BEHAVIOR)
         if mode == 'bilateral':
             cmds.setFocus(self.objectName())
 
@@ -376,22 +394,19 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
             om.MSceneMessage.kAfterOpen: [
                 self.load_saved_pickers, self.update_namespaces],
             om.MSceneMessage.kAfterCreateReference: [
-                self.load_saved_pickers, self.update_namespaces]}
-        if not cmds.optionVar(query=DISABLE_IMPORT_CALLBACKS):
+                self.load_new_pickers, self.update_namespaces]}
+        if not get_optionvar(DISABLE_IMPORT_CALLBACKS):
             callbacks[om.MSceneMessage.kAfterImport] = [
-                self.load_saved_pickers, self.update_namespaces]
+                self.load_new_pickers, self.update_namespaces]
 
         for event, methods in callbacks.items():
             for method in methods:
                 callback = om.MSceneMessage.addCallback(event, method)
                 self.callbacks.append(callback)
 
-        method = self.auto_switch_tab
-        cb = om.MEventMessage.addEventCallback('SelectionChanged', method)
-        self.callbacks.append(cb)
-        method = self.auto_switch_namespace
-        cb = om.MEventMessage.addEventCallback('SelectionChanged', method)
-        self.callbacks.append(cb)
+        holder_nodes.register_callbacks()
+        dispatcher.register(self.auto_switch_tab)
+        dispatcher.register(self.auto_switch_namespace)
 
         for picker in self.pickers:
             picker.register_callbacks()
@@ -399,51 +414,102 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
     def unregister_callbacks(self):
         for cb in self.callbacks:
             om.MMessage.removeCallback(cb)
-            self.callbacks.remove(cb)
+        self.callbacks = []
+        holder_nodes.unregister_callbacks()
+        dispatcher.unregister(self.auto_switch_tab)
+        dispatcher.unregister(self.auto_switch_namespace)
         for picker in self.pickers:
             picker.unregister_callbacks()
 
-    def auto_switch_namespace(self, *_, **__):
-        if not cmds.optionVar(query=AUTO_SET_NAMESPACE):
+    def auto_switch_namespace(self, selection=None):
+        if not get_optionvar(AUTO_SET_NAMESPACE):
             return
-        self.pick_namespace()
+        self.pick_namespace(selection)
 
-    def auto_switch_tab(self, *_, **__):
-        if not cmds.optionVar(query=AUTO_SWITCH_TAB):
+    def auto_switch_tab(self, selection=None):
+        if not get_optionvar(AUTO_SWITCH_TAB):
             return
-        nodes = cmds.ls(selection=True)
+        nodes = cmds.ls(selection=True) if selection is None else selection
         if not nodes:
             return
         picker = self.tab.currentWidget()
         if not picker:
             return
-        targets = list_targets(picker.document.shapes)
-        if nodes[-1] in targets:
+        pickers = self.pickers_by_target.get(nodes[-1])
+        if not pickers or picker in pickers:
             return
-        for i, picker in enumerate(self.pickers):
-            if nodes[-1] in list_targets(picker.document.shapes):
-                self.tab.setCurrentIndex(i)
-                return
+        self.tab.setCurrentIndex(min(self.tab.indexOf(p) for p in pickers))
+
+    def index_picker_targets(self, picker, targets=None):
+        """
+        Set the picker targets in the targets index.
+        targets: the document ones by default.
+        """
+        if targets is None:
+            targets = picker.document.list_targets()
+        old_targets = self.targets_by_picker.get(picker, set())
+        self.update_picker_targets(
+            picker, targets - old_targets, old_targets - targets)
+
+    def update_picker_targets(self, picker, added, removed):
+        """
+        Apply the targets changes of a picker (see
+        PickerDocument.targets_changed) to the targets index.
+        """
+        targets = self.targets_by_picker.setdefault(picker, set())
+        for target in removed & targets:
+            pickers = self.pickers_by_target[target]
+            pickers.remove(picker)
+            if not pickers:
+                del self.pickers_by_target[target]
+        for target in added - targets:
+            self.pickers_by_target[target].append(picker)
+        targets -= removed
+        targets |= added
+        if not targets:
+            del self.targets_by_picker[picker]
 
     def load_saved_pickers(self, *_, **__):
         self.clear()
-        pickers = load_local_picker_data()
-        if cmds.optionVar(query=CHECK_IMAGES_PATHS):
+        nodes = list_picker_holder_nodes()
+        self.loaded_holder_nodes = HolderNodeSet(nodes)
+        self.add_pickers(load_local_picker_data(nodes))
+        clean_stray_picker_holder_nodes()
+
+    def load_new_pickers(self, *_, **__):
+        """
+        Append the pickers of the holder nodes which appeared since the last
+        load (reference or import) and keep the existing tabs untouched.
+        """
+        nodes = [
+            node for node in list_picker_holder_nodes()
+            if node not in self.loaded_holder_nodes]
+        if not nodes:
+            return
+        self.loaded_holder_nodes.update(nodes)
+        self.add_pickers(load_local_picker_data(nodes))
+        # Merge the new pickers in the scene main holder node and clean the
+        # imported holder nodes.
+        self.store_local_pickers_data()
+
+    def add_pickers(self, pickers):
+        if get_optionvar(CHECK_IMAGES_PATHS):
             ensure_images_path_exists(pickers)
         for picker in pickers:
-            self.add_picker(picker)
-        clean_stray_picker_holder_nodes()
+            # Changing the current tab would build every picker.
+            self.add_picker(picker, set_current=False)
 
     def store_local_pickers_data(self):
         if not self.editable:
             return
 
-        if not self.tab.count():
-            store_local_picker_data([])
-            return
-
-        pickers = [self.document(i).data for i in range(self.tab.count())]
-        store_local_picker_data(pickers)
+        documents = [self.document(i) for i in range(self.tab.count())]
+        store_local_picker_data(
+            [document.data for document in documents],
+            [document.revision for document in documents])
+        # The main holder node, created on the first store, only holds the
+        # opened pickers. It must not be loaded as a new holder node.
+        self.loaded_holder_nodes.update([PICKER_HOLDER_NODE])
 
     def save_tab(self, index):
         msg = (
@@ -464,6 +530,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         return True
 
     def close_tabs(self, *_):
+        self.loaded_holder_nodes = HolderNodeSet()
         for i in range(self.tab.count()-1, -1, -1):
             self.close_tab(i)
         self.store_local_pickers_data()
@@ -477,7 +544,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
             if not self.save_tab(index):
                 return
 
-        elif (cmds.optionVar(query=WARN_ON_TAB_CLOSED) and
+        elif (get_optionvar(WARN_ON_TAB_CLOSED) and
               not question('Warning', CLOSE_TAB_WARNING)):
             return
 
@@ -485,6 +552,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         if editor:
             editor.close()
         picker = self.pickers.pop(index)
+        self.index_picker_targets(picker, set())
         picker.unregister_callbacks()
         picker.close()
         self.tab.removeTab(index)
@@ -492,9 +560,9 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
             self.store_local_pickers_data()
 
     def load_ui_states(self):
-        value = bool(cmds.optionVar(query=DISPLAY_QUICK_OPTIONS))
+        value = bool(get_optionvar(DISPLAY_QUICK_OPTIONS))
         self.quick_options.setVisible(value)
-        value = bool(cmds.optionVar(query=NAMESPACE_TOOLBAR))
+        value = bool(get_optionvar(NAMESPACE_TOOLBAR))
         self.namespace_widget.setVisible(value)
         self.update_namespaces()
         self.update_modified_states()
@@ -523,30 +591,37 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
             self.set_title(i, self.document(i).data['general']['name'])
 
     def create_picker(self, data):
-        document = PickerDocument(data)
+        # Shapes and panels are built when the tab is shown the first time.
+        document = PickerDocument(data, lazy=True)
         document.changed.connect(self.store_local_pickers_data)
         document.general_option_changed.connect(self.general_changed)
         document.data_changed.connect(self.update_names)
         document.changed.connect(self.update_modified_states)
-        picker = PickerStackedView(document, self.editable)
+        picker = PickerStackedView(document, self.editable, lazy=True)
         picker.register_callbacks()
+        document.targets_changed.connect(
+            partial(self.update_picker_targets, picker))
+        self.index_picker_targets(picker)
         return picker
 
-    def add_picker(self, data, filename=None, modified_state=False):
+    def add_picker(
+            self, data, filename=None, modified_state=False,
+            set_current=True):
         picker = self.create_picker(data)
         picker.document.filename = filename
         picker.document.modified_state = modified_state
-        insert = cmds.optionVar(query=INSERT_TAB_AFTER_CURRENT)
+        insert = get_optionvar(INSERT_TAB_AFTER_CURRENT)
         if not insert or self.tab.currentIndex() == self.tab.count() - 1:
+            index = self.tab.count()
             self.pickers.append(picker)
             self.editors.append(None)
             self.tab.addTab(picker, data['general']['name'])
-            self.tab.setCurrentIndex(self.tab.count() - 1)
         else:
             index = self.tab.currentIndex() + 1
             self.pickers.insert(index, picker)
             self.editors.insert(index, None)
             self.tab.insertTab(index, picker, data['general']['name'])
+        if set_current:
             self.tab.setCurrentIndex(index)
         picker.reset(force_all=True)
 
@@ -576,7 +651,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         index = self.tab.currentIndex() if type(index) is not int else index
         filename = QtWidgets.QFileDialog.getSaveFileName(
             None, "Save a picker ...",
-            cmds.optionVar(query=LAST_SAVE_DIRECTORY),
+            get_optionvar(LAST_SAVE_DIRECTORY),
             filter="Dreamwall Picker (*.json)")[0]
 
         if not filename:
@@ -614,6 +689,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         return True
 
     def call_import(self):
+        from dwpicker.ingest import animschool, mgear
         filters = {
             "Anim School Picker (*.pkr)": animschool.convert,
             "MGear (*.pkr)": mgear.convert
@@ -658,6 +734,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
             QtWidgets.QMessageBox.warning(self, "Warning", "No picker set")
             return
         if self.editors[index] is None:
+            from dwpicker.designer.editor import PickerEditor
             document = self.document()
             editor = PickerEditor(
                 document,
@@ -688,7 +765,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
     def update_modified_states(self):
         for index, picker in enumerate(self.pickers):
             state = picker.document.modified_state
-            use_icon = cmds.optionVar(query=USE_ICON_FOR_UNSAVED_TAB)
+            use_icon = get_optionvar(USE_ICON_FOR_UNSAVED_TAB)
             icon_ = icon('save.png') if state and use_icon else QtGui.QIcon()
             self.tab.setTabIcon(index, icon_)
             title = self.document(index).data['general']['name']
@@ -703,7 +780,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         if not self.document(index).filename:
             return
         self.document(index).modified_state = state
-        use_icon = cmds.optionVar(query=USE_ICON_FOR_UNSAVED_TAB)
+        use_icon = get_optionvar(USE_ICON_FOR_UNSAVED_TAB)
         icon_ = icon('save.png') if state and use_icon else QtGui.QIcon()
         self.tab.setTabIcon(index, icon_)
         title = self.document(index).data['general']['name']
@@ -750,7 +827,7 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         self.set_title(index, title)
 
     def set_title(self, index=None, title=''):
-        use_icon = cmds.optionVar(query=USE_ICON_FOR_UNSAVED_TAB)
+        use_icon = get_optionvar(USE_ICON_FOR_UNSAVED_TAB)
         if not use_icon and self.document(index).modified_state:
             title = "*" + title
         self.tab.setTabText(index, title)
@@ -768,8 +845,8 @@ class DwPicker(DockableBase, QtWidgets.QWidget):
         namespace = text if index else ":"
         self.change_namespace(namespace)
 
-    def pick_namespace(self):
-        namespace = selected_namespace()
+    def pick_namespace(self, selection=None):
+        namespace = selected_namespace(selection)
         self.namespace_combo.setCurrentText(namespace)
 
     def change_namespace(self, namespace):
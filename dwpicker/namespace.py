@@ -5,6 +5,10 @@ from maya import cmds
 
 def detect_picker_namespace(shapes):
     targets = {target for shape in shapes for target in shape.targets()}
+    return detect_targets_namespace(targets)
+
+
+def detect_targets_namespace(targets):
     namespaces = {ns for ns in [node_namespace(t) for t in targets] if ns}
     if len(namespaces) != 1:
         return None
@@ -12,8 +16,8 @@ def detect_picker_namespace(shapes):
 
 
 def pickers_namespaces(pickers):
-    targets = {
-        t for p in pickers for s in p.document.shapes for t in s.targets()}
+    # Read from the data to not build the shapes of the pickers never shown.
+    targets = {t for p in pickers for t in p.document.list_targets()}
     namespaces = {ns for ns in [node_namespace(t) for t in targets] if ns}
     return sorted(list(namespaces))
 
@@ -60,8 +64,9 @@ def switch_namespace(name, namespace):
     return namespace + ":" + name
 
 
-def selected_namespace():
-    selection = cmds.ls(selection=True)
+def selected_namespace(selection=None):
+    if selection is None:
+        selection = cmds.ls(selection=True)
     if not selection:
         return ":"
     node = selection[0]
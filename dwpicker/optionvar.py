@@ -1,6 +1,7 @@
 import os
 import sys
 from maya import cmds
+from dwpicker.pyside import QtCore
 
 
 AUTO_FOCUS_BEHAVIORS = ['off', 'bilateral', 'pickertomaya']
@@ -34,10 +35,13 @@ LAST_IMAGE_DIRECTORY_USED = 'dwpicker_last_directory_used'
 LAST_IMPORT_DIRECTORY = 'dwpicker_last_file_import_directory'
 LAST_OPEN_DIRECTORY = 'dwpicker_last_file_open_directory'
 LAST_SAVE_DIRECTORY = 'dwpicker_last_file_save_directory'
+LAST_UPDATE_CHECK = 'dwpicker_last_update_check'
+LATEST_VERSION = 'dwpicker_latest_version'
 OPENED_FILES = 'dwpicker_opened_files'
 NAMESPACE_TOOLBAR = 'dwpicker_display_dwtoolbar'
 RECENT_FILES = 'dwpicker_recent_files'
 SEARCH_FIELD_INDEX = 'dwpicker_designer_search_field_index'
+SELECTION_SYNC_LATENCY = 'dwpicker_selection_sync_latency'
 SETTINGS_GROUP_TO_COPY = 'dwpicker_settings_group_to_copy'
 SETTINGS_TO_COPY = 'dwpicker_settings_to_copy'
 SHAPES_FILTER_INDEX = 'dwpicker_designer_shape_filter_index'
@@ -48,6 +52,7 @@ SNAP_GRID_Y = 'dwpicker_designer_snap_y'
 SYNCHRONYZE_SELECTION = 'dwpicker_synchronize_selection'
 TRIGGER_REPLACE_ON_MIRROR = 'dwpicker_trigger_search_and_replace_on_mirror'
 USE_BASE64_DATA_ENCODING = 'dwpicker_use_base64_data_encoding'
+USE_COMPRESSED_DATA_CHUNKS = 'dwpicker_use_compressed_data_chunks'
 USE_ICON_FOR_UNSAVED_TAB = 'dwpicker_use_icon_for_unsaved_tab'
 USE_PROD_PICKER_DIR_AS_DEFAULT = 'dwpicker_user_prod_picker_dir_for_import'
 ZOOM_BUTTON = 'dwpicker_picker_zoom_mouse_button'
@@ -96,12 +101,15 @@ OPTIONVARS = {
     LAST_IMPORT_DIRECTORY: os.path.expanduser("~"),
     LAST_COMMAND_LANGUAGE: 0,  # 0 = python, 1 = mel
     LAST_IMAGE_DIRECTORY_USED: os.path.expanduser("~"),
+    LAST_UPDATE_CHECK: 0,  # seconds since epoch
+    LATEST_VERSION: '',
     NAMESPACE_TOOLBAR: 0,
     OPENED_FILES: '',
     RECENT_FILES: '',
     SEARCH_FIELD_INDEX: 0,
     SHAPES_FILTER_INDEX: 0,
     SHAPE_PATH_ROTATION_STEP_ANGLE: 15,
+    SELECTION_SYNC_LATENCY: 50,  # milliseconds
     SETTINGS_GROUP_TO_COPY: 'bordercolor;text;image;bgcolor;shape;borderwidth;border',
     SETTINGS_TO_COPY: (
         'bgcolor.clicked;bgcolor.hovered;bgcolor.normal;bgcolor.transparency;'
@@ -117,6 +125,7 @@ OPTIONVARS = {
     SYNCHRONYZE_SELECTION: 1,
     TRIGGER_REPLACE_ON_MIRROR: 0,
     USE_BASE64_DATA_ENCODING: 0,
+    USE_COMPRESSED_DATA_CHUNKS: 0,
     USE_ICON_FOR_UNSAVED_TAB: 1,
     USE_PROD_PICKER_DIR_AS_DEFAULT: 0,
     WARN_ON_TAB_CLOSED: 0,
@@ -136,16 +145,60 @@ if sys.version_info[0] == 2:
     TYPES[unicode] = 'stringValue'
 
 
+class OptionVarNotifier(QtCore.QObject):
+    # optionvar name, new value
+    changed = QtCore.Signal(str, object)
+
+
+# Values of the option variables, read once from Maya. All the writes done
+# by dwpicker go through save_optionvar to keep them up to date.
+_values = {}
+_notifier = None
+
+
+def optionvar_notifier():
+    """
+    Return the QObject emitting changed(name, value) when an option
+    variable is saved.
+    """
+    global _notifier
+    if _notifier is None:
+        _notifier = OptionVarNotifier()
+    return _notifier
+
+
 def ensure_optionvars_exists():
     for optionvar, default_value in OPTIONVARS.items():
         if cmds.optionVar(exists=optionvar):
             continue
         save_optionvar(optionvar, default_value)
+    load_optionvars()
+
+
+def load_optionvars():
+    """
+    (Re)load the option variables values from Maya. Needed if they are
+    modified outside of dwpicker.
+    """
+    _values.clear()
+    for optionvar in OPTIONVARS:
+        _values[optionvar] = cmds.optionVar(query=optionvar)
+
+
+def get_optionvar(optionvar):
+    try:
+        return _values[optionvar]
+    except KeyError:
+        value = cmds.optionVar(query=optionvar)
+        _values[optionvar] = value
+        return value
 
 
 def save_optionvar(optionvar, value):
     kwargs = {TYPES.get(type(value)): [optionvar, value]}
     cmds.optionVar(**kwargs)
+    _values[optionvar] = value
+    optionvar_notifier().changed.emit(optionvar, value)
 
 
 def save_opened_filenames(filenames):
@@ -154,9 +207,9 @@ def save_opened_filenames(filenames):
 
 def append_recent_filename(filename):
     filename = os.path.normpath(filename)
-    stored_filenames = cmds.optionVar(query=RECENT_FILES)
+    stored_filenames = get_optionvar(RECENT_FILES)
     if not stored_filenames:
-        cmds.optionVar(stringValue=[RECENT_FILES, filename + ';'])
+        save_optionvar(RECENT_FILES, filename + ';')
         return
 
     # Just reorder list if the filename is already in the recent filenames.
@@ -165,12 +218,11 @@ def append_recent_filename(filename):
         if os.path.normpath(stored_filename) == filename:
             stored_filenames.remove(stored_filename)
             stored_filenames.insert(0, filename)
-            cmds.optionVar(
-                stringValue=[RECENT_FILES, ';'.join(stored_filenames)])
+            save_optionvar(RECENT_FILES, ';'.join(stored_filenames))
             return
 
     # Append to list if new filename.
     if len(stored_filenames) >= 10:
         stored_filenames = stored_filenames[:9]
     stored_filenames.insert(0, filename)
-    cmds.optionVar(stringValue=[RECENT_FILES, ';'.join(stored_filenames)])
+    save_optionvar(RECENT_FILES, ';'.join(stored_filenames))
@@ -1,9 +1,9 @@
 from dwpicker.pyside import QtCore, QtGui
-from maya import cmds
 
-from dwpicker.optionvar import ZOOM_SENSITIVITY
+from dwpicker.optionvar import ZOOM_SENSITIVITY, get_optionvar
 from dwpicker.qtutils import VALIGNS, HALIGNS
 from dwpicker.geometry import grow_rect, get_connection_path
+from dwpicker.imagecache import use_image
 from dwpicker.shape import to_shape_space_rect, to_shape_space
 from dwpicker.viewport import ViewportMapper
 
@@ -13,10 +13,12 @@ PANEL_COLOR = '#00FFFF'
 FOCUS_COLOR = '#FFFFFF'
 MANIPULATOR_BORDER = 5
 CONNECTION_COLOR = '#666666'
+IMAGE_PLACEHOLDER_COLOR = '#888888'
+PROFILING_OVERLAY_COLOR = '#FFDD44'
 
 
 def factor_sensitivity(factor):
-    sensitivity = cmds.optionVar(query=ZOOM_SENSITIVITY) / 50.0
+    sensitivity = get_optionvar(ZOOM_SENSITIVITY) / 50.0
     return factor * sensitivity
 
 
@@ -154,59 +156,89 @@ def draw_shape_as_child_background(
     painter.drawRect(rect)
 
 
+class ShapeRenderStyle():
+    """
+    Qt objects needed to paint a shape in its different states, built once
+    from the shape options. It is stored on the shape and has to be dropped
+    when the options change (see Shape.invalidate_render_style).
+    """
+    STATES = 'normal', 'hovered', 'clicked'
+
+    def __init__(self, options):
+        alpha = (
+            options['bordercolor.transparency'] if options['border'] else 255)
+        self.pens = {}
+        self.brushes = {}
+        self.border_widths = {}
+        for state in self.STATES:
+            bordercolor = QtGui.QColor(options['bordercolor.' + state])
+            bordercolor.setAlpha(255 - alpha)
+            pen = QtGui.QPen(bordercolor)
+            pen.setStyle(QtCore.Qt.SolidLine)
+            self.pens[state] = pen
+            self.border_widths[state] = options['borderwidth.' + state]
+            backgroundcolor = QtGui.QColor(options['bgcolor.' + state])
+            backgroundcolor.setAlpha(255 - options['bgcolor.transparency'])
+            self.brushes[state] = QtGui.QBrush(backgroundcolor)
+
+        self.text_pen = QtGui.QPen(QtGui.QColor(options['text.color']))
+        self.text_flags = (
+            VALIGNS[options['text.valign']] | HALIGNS[options['text.halign']])
+        self.text_size = options['text.size']
+        self.font = QtGui.QFont()
+        self.font.setBold(options['text.bold'])
+        self.font.setItalic(options['text.italic'])
+        self.font_pixel_size = None
+
+    def set_font_pixel_size(self, size):
+        if size != self.font_pixel_size:
+            self.font.setPixelSize(size)
+            self.font_pixel_size = size
+
+
+def get_render_style(shape):
+    if shape.render_style is None:
+        shape.render_style = ShapeRenderStyle(shape.options)
+    return shape.render_style
+
+
 def draw_shape(
         painter, shape, force_world_space=True,
         draw_selected_state=True, viewportmapper=None):
 
     viewportmapper = viewportmapper or ViewportMapper()
     options = shape.options
+    style = get_render_style(shape)
     content_rect = shape.content_rect()
     if shape.clicked or (shape.selected and draw_selected_state):
-        bordercolor = QtGui.QColor(options['bordercolor.clicked'])
-        backgroundcolor = QtGui.QColor(options['bgcolor.clicked'])
-        bordersize = options['borderwidth.clicked']
+        state = 'clicked'
     elif shape.hovered:
-        bordercolor = QtGui.QColor(options['bordercolor.hovered'])
-        backgroundcolor = QtGui.QColor(options['bgcolor.hovered'])
-        bordersize = options['borderwidth.hovered']
+        state = 'hovered'
     else:
-        bordercolor = QtGui.QColor(options['bordercolor.normal'])
-        backgroundcolor = QtGui.QColor(options['bgcolor.normal'])
-        bordersize = options['borderwidth.normal']
-
-    textcolor = QtGui.QColor(options['text.color'])
-    alpha = options['bordercolor.transparency'] if options['border'] else 255
-    bordercolor.setAlpha(255 - alpha)
-    backgroundcolor.setAlpha(255 - options['bgcolor.transparency'])
-
-    pen = QtGui.QPen(bordercolor)
-    pen.setStyle(QtCore.Qt.SolidLine)
-    w = to_shape_space(bordersize, shape, force_world_space, viewportmapper)
+        state = 'normal'
+
+    pen = style.pens[state]
+    w = to_shape_space(
+        style.border_widths[state], shape, force_world_space, viewportmapper)
     pen.setWidthF(w)
     painter.setPen(pen)
-    painter.setBrush(QtGui.QBrush(backgroundcolor))
+    painter.setBrush(style.brushes[state])
     rect = to_shape_space_rect(
         shape.rect, shape, force_world_space, viewportmapper)
     r = draw_shape_shape(
         painter, rect, shape, force_world_space, viewportmapper)
 
-    painter.setPen(QtGui.QPen(textcolor))
-    painter.setBrush(QtGui.QBrush(textcolor))
-    option = QtGui.QTextOption()
-    flags = VALIGNS[options['text.valign']] | HALIGNS[options['text.halign']]
-    option.setAlignment(flags)
-    font = QtGui.QFont()
-    font.setBold(options['text.bold'])
-    font.setItalic(options['text.italic'])
-    size = to_shape_space(
-        options['text.size'], shape, force_world_space, viewportmapper)
-    font.setPixelSize(round(size))
-    painter.setFont(font)
     text = options['text.content']
-
+    if not text:
+        return r
+    painter.setPen(style.text_pen)
+    size = to_shape_space(
+        style.text_size, shape, force_world_space, viewportmapper)
+    style.set_font_pixel_size(int(round(size)))
+    painter.setFont(style.font)
     content_rect = to_shape_space_rect(
         content_rect, shape, force_world_space, viewportmapper)
-    painter.drawText(content_rect, flags, text)
+    painter.drawText(content_rect, style.text_flags, text)
     return r
 
 
@@ -238,16 +270,49 @@ def draw_shape_shape(painter, rect, shape, force_world_space, viewportmapper):
         painter.drawPath(qpath)
         qpath = qpath
 
-    if shape.pixmap is not None:
+    if shape.image is not None:
+        use_image(shape.image)
+
+    if shape.image is not None and shape.image.pending:
+        transformed_rect = shape.image_rect or content_rect
+        transformed_rect = to_shape_space_rect(
+            transformed_rect, shape, force_world_space, viewportmapper)
+        draw_image_placeholder(painter, transformed_rect, qpath)
+
+    elif shape.image is not None and not shape.image.is_null():
         painter.setClipPath(qpath)
         transformed_rect = shape.image_rect or content_rect
         transformed_rect = to_shape_space_rect(
             transformed_rect, shape, force_world_space, viewportmapper)
-        painter.drawPixmap(transformed_rect.toRect(), shape.pixmap)
+        ratio = painter.device().devicePixelRatioF()
+        pixmap = shape.image.pixmap_for_size(
+            transformed_rect.width() * ratio,
+            transformed_rect.height() * ratio)
+        painter.drawPixmap(transformed_rect.toRect(), pixmap)
         painter.setClipping(False)
     return qpath
 
 
+def draw_image_placeholder(painter, rect, clip_path):
+    color = QtGui.QColor(IMAGE_PLACEHOLDER_COLOR)
+    color.setAlpha(50)
+    painter.setClipPath(clip_path)
+    painter.fillRect(rect, color)
+    painter.setClipping(False)
+
+
+def draw_profiling_overlay(painter, rect, lines):
+    color = QtGui.QColor('black')
+    color.setAlpha(150)
+    painter.setPen(QtCore.Qt.NoPen)
+    painter.setBrush(color)
+    painter.drawRect(rect)
+    painter.setPen(QtGui.QColor(PROFILING_OVERLAY_COLOR))
+    painter.setBrush(QtCore.Qt.NoBrush)
+    flags = QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter
+    painter.drawText(rect.adjusted(6, 0, -6, 0), flags, '\n'.join(lines))
+
+
 def draw_selection_square(painter, rect, viewportmapper=None):
     viewportmapper = viewportmapper or ViewportMapper()
     rect = viewportmapper.to_viewport_rect(rect)
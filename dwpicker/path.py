@@ -1,11 +1,11 @@
 
 
 import os
-from maya import cmds
 from dwpicker.optionvar import (
     AUTO_COLLAPSE_IMG_PATH_FROM_ENV, CUSTOM_PROD_PICKER_DIRECTORY,
     LAST_IMPORT_DIRECTORY, LAST_IMAGE_DIRECTORY_USED, LAST_OPEN_DIRECTORY,
-    OVERRIDE_PROD_PICKER_DIRECTORY_ENV, USE_PROD_PICKER_DIR_AS_DEFAULT)
+    OVERRIDE_PROD_PICKER_DIRECTORY_ENV, USE_PROD_PICKER_DIR_AS_DEFAULT,
+    get_optionvar)
 
 
 def unix_path(path, isroot=False):
@@ -27,7 +27,7 @@ def format_path(path, force=False):
     if path is None:
         return
     path = unix_path(path)
-    if not cmds.optionVar(query=AUTO_COLLAPSE_IMG_PATH_FROM_ENV) and not force:
+    if not get_optionvar(AUTO_COLLAPSE_IMG_PATH_FROM_ENV) and not force:
         return path
     root = get_picker_project_directory()
     if not root or not path.lower().startswith(root.lower()):
@@ -37,8 +37,8 @@ def format_path(path, force=False):
 
 
 def get_picker_project_directory():
-    if cmds.optionVar(query=OVERRIDE_PROD_PICKER_DIRECTORY_ENV):
-        path = cmds.optionVar(query=CUSTOM_PROD_PICKER_DIRECTORY)
+    if get_optionvar(OVERRIDE_PROD_PICKER_DIRECTORY_ENV):
+        path = get_optionvar(CUSTOM_PROD_PICKER_DIRECTORY)
         return unix_path(path) if path else None
     path = os.getenv('DWPICKER_PROJECT_DIRECTORY')
     return unix_path(path) if path else None
@@ -46,8 +46,8 @@ def get_picker_project_directory():
 
 def expand_path(path):
     backup = None
-    if cmds.optionVar(query=OVERRIDE_PROD_PICKER_DIRECTORY_ENV):
-        root = unix_path(cmds.optionVar(query=CUSTOM_PROD_PICKER_DIRECTORY))
+    if get_optionvar(OVERRIDE_PROD_PICKER_DIRECTORY_ENV):
+        root = unix_path(get_optionvar(CUSTOM_PROD_PICKER_DIRECTORY))
         backup = os.getenv('DWPICKER_PROJECT_DIRECTORY')
         os.environ['DWPICKER_PROJECT_DIRECTORY'] = root
     result = os.path.expandvars(path)
@@ -57,24 +57,24 @@ def expand_path(path):
 
 
 def get_open_directory():
-    if cmds.optionVar(query=USE_PROD_PICKER_DIR_AS_DEFAULT):
+    if get_optionvar(USE_PROD_PICKER_DIR_AS_DEFAULT):
         directory = get_picker_project_directory()
         if directory:
             return directory
-    return cmds.optionVar(query=LAST_OPEN_DIRECTORY)
+    return get_optionvar(LAST_OPEN_DIRECTORY)
 
 
 def get_import_directory():
-    if cmds.optionVar(query=USE_PROD_PICKER_DIR_AS_DEFAULT):
+    if get_optionvar(USE_PROD_PICKER_DIR_AS_DEFAULT):
         directory = get_picker_project_directory()
         if directory:
             return directory
-    return cmds.optionVar(query=LAST_IMPORT_DIRECTORY)
+    return get_optionvar(LAST_IMPORT_DIRECTORY)
 
 
 def get_image_directory():
-    if cmds.optionVar(query=USE_PROD_PICKER_DIR_AS_DEFAULT):
+    if get_optionvar(USE_PROD_PICKER_DIR_AS_DEFAULT):
         directory = get_picker_project_directory()
         if directory:
             return directory
-    return cmds.optionVar(query=LAST_IMAGE_DIRECTORY_USED)
+    return get_optionvar(LAST_IMAGE_DIRECTORY_USED)
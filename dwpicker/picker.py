@@ -2,26 +2,32 @@ from copy import deepcopy
 from functools import partial
 
 from maya import cmds
-import maya.OpenMaya as om
 from dwpicker.pyside import QtWidgets, QtGui, QtCore
 
 from dwpicker.align import align_shapes_on_line
 from dwpicker.compatibility import ensure_general_options_sanity
 from dwpicker.document import PickerDocument
 from dwpicker.dialog import warning, CommandEditorDialog
+from dwpicker.imagecache import image_loader
 from dwpicker.interactive import SelectionSquare
 from dwpicker.interactionmanager import InteractionManager
-from dwpicker.geometry import get_combined_rects, get_connection_path
+from dwpicker.geometry import (
+    get_combined_rects, get_connection_path, grow_rect)
 from dwpicker.languages import execute_code
 from dwpicker.optionvar import (
-    save_optionvar, DEFAULT_BG_COLOR, DEFAULT_TEXT_COLOR, DEFAULT_WIDTH,
-    DEFAULT_HEIGHT, DEFAULT_LABEL, DISPLAY_HIERARCHY_IN_PICKER,
-    LAST_COMMAND_LANGUAGE, SYNCHRONYZE_SELECTION, ZOOM_SENSITIVITY)
+    get_optionvar, optionvar_notifier, save_optionvar, DEFAULT_BG_COLOR,
+    DEFAULT_TEXT_COLOR, DEFAULT_WIDTH, DEFAULT_HEIGHT, DEFAULT_LABEL,
+    DISPLAY_HIERARCHY_IN_PICKER, LAST_COMMAND_LANGUAGE, SYNCHRONYZE_SELECTION,
+    ZOOM_SENSITIVITY)
 from dwpicker.painting import (
-    draw_shape, draw_selection_square, draw_picker_focus, draw_connections)
+    draw_shape, draw_selection_square, draw_picker_focus, draw_connections,
+    draw_profiling_overlay)
+from dwpicker.profiling import clock, overlay_visible, probe
 from dwpicker.qtutils import get_cursor, clear_layout
 from dwpicker.shape import (
-    build_multiple_shapes, cursor_in_shape, rect_intersects_shape)
+    build_multiple_shapes, cursor_in_shape, get_shape_viewport_rect,
+    rect_intersects_shape)
+from dwpicker.selectiondispatcher import dispatcher
 from dwpicker.stack import create_stack_splitters, count_panels
 from dwpicker.selection import (
     select_targets, select_shapes_from_selection, get_selection_mode,
@@ -30,6 +36,10 @@ from dwpicker.templates import BUTTON, COMMAND
 from dwpicker.viewport import ViewportMapper
 
 
+# Extra viewport pixels repainted around a dirty rect to include borders
+# and anti-aliasing of the neighbour shapes.
+REPAINT_MARGIN = 4
+PROFILING_OVERLAY_RECT = QtCore.QRect(8, 8, 200, 56)
 SPLITTER_STYLE = """\
 QSplitter::handle {
     background-color: rgba(0, 0, 0, 50);
@@ -40,30 +50,67 @@ QSplitter::handle {
 """
 
 
+@probe('hover')
 def set_shapes_hovered(
         shapes,
         world_cursor,
         viewport_cursor,
         selection_rect,
         viewport_selection_rect,
-        viewportmapper=None):
+        viewportmapper=None,
+        candidates=None,
+        document=None,
+        hovered_shapes=None,
+        shape_filter=None):
     """
     It set hovered the shape if his rect contains the cursor.
+    candidates: optional subset of the shapes which can physically be under
+    the cursor or the selection rect (e.g. from the panel spatial index).
+    Others shapes can only be hovered by sharing targets.
+    document: if given, the shapes sharing the hovered targets are found from
+    the document targets index instead of testing every shapes. Only the
+    hovered_shapes (hovered before the call) and the new hovered shapes are
+    updated, shapes isn't used.
+    shape_filter: with the document, function filtering the shapes which can
+    be hovered (e.g. the shapes displayed by the view).
+    return: list of shapes which changed hovered state.
     """
-    if not shapes:
-        return
     world_cursor = world_cursor.toPoint()
-    shapes = [s for s in shapes if not s.is_background()]
+    if document is None:
+        if not shapes:
+            return []
+        shapes = [s for s in shapes if not s.is_background()]
+    if candidates is None:
+        candidates = shapes or []
     selection_shapes_intersect_selection = [
-        s for s in shapes
-        if cursor_in_shape(s, world_cursor, viewport_cursor, False, viewportmapper)
-        or rect_intersects_shape(
-            shape=s,
-            unit_rect=selection_rect,
-            viewport_rect=viewport_selection_rect,
-            force_world_space=False,
-            viewportmapper=viewportmapper)]
+        s for s in candidates if not s.is_background() and (
+            cursor_in_shape(
+                s, world_cursor, viewport_cursor, False, viewportmapper) or
+            rect_intersects_shape(
+                shape=s,
+                unit_rect=selection_rect,
+                viewport_rect=viewport_selection_rect,
+                force_world_space=False,
+                viewportmapper=viewportmapper))]
     targets = list_targets(selection_shapes_intersect_selection)
+    if document is not None:
+        # Simple highlighting method for the interactive buttons.
+        hovered = [
+            s for s in selection_shapes_intersect_selection
+            if not s.targets()]
+        # Set all buttons hovered from his targets contents.
+        hovered.extend(
+            s for s in document.shapes_from_targets(targets)
+            if all(t in targets for t in s.targets()))
+        if shape_filter is not None:
+            hovered = shape_filter(hovered)
+        hovered = {id(s): s for s in hovered if not s.is_background()}
+        shapes = [s for s in hovered_shapes or [] if id(s) not in hovered]
+        shapes.extend(hovered.values())
+        return set_hovered_states(
+            shapes, [id(s) in hovered for s in shapes])
+
+    states = []
     for s in shapes:
         if s.targets():
             # Set all buttons hovered from his targets contents.
@@ -75,7 +122,17 @@ def set_shapes_hovered(
             state = s in selection_shapes_intersect_selection
         else:
             state = False
-        s.hovered = state
+        states.append(state)
+    return set_hovered_states(shapes, states)
+
+
+def set_hovered_states(shapes, states):
+    changed = []
+    for shape, state in zip(shapes, states):
+        if shape.hovered != state:
+            shape.hovered = state
+            changed.append(shape)
+    return changed
 
 
 def detect_hovered_shape(shapes, world_cursor, screen_cursor, viewportmapper):
@@ -96,9 +153,129 @@ def list_targets(shapes):
     return {t for s in shapes for t in s.targets()}
 
 
+def is_static_shape(shape):
+    """
+    Static shapes can't change their aspect through picker interactions.
+    """
+    return (
+        shape.is_background() and
+        shape.options['shape.space'] == 'world' and
+        not shape.targets())
+
+
+def list_static_shapes(shapes, hidden_layers):
+    """
+    List the static shapes at the bottom of the stack. The first
+    non static shape stops the look up to preserve the drawing order.
+    """
+    result = []
+    for shape in shapes:
+        layer = shape.visibility_layer()
+        if layer and layer in hidden_layers:
+            continue
+        if not is_static_shape(shape):
+            break
+        result.append(shape)
+    return result
+
+
+class StaticLayer():
+    """
+    Offscreen rendering of the static shapes (backgrounds, big images ...).
+    The pixmap covers the viewport plus a margin of half its size on each
+    side, so panning only blit it with an offset. It is rendered again when
+    the zoom, the viewport size, the device pixel ratio, the hidden layers
+    change, when it is invalidated (document changes) or when panning goes
+    further than the rendered area.
+    """
+    def __init__(self):
+        self.pixmap = None
+        self.key = None
+        # Rendered area in viewport coordinates at render time.
+        self.rect = None
+        self.origin = None
+        # Static shapes bounding rect in units.
+        self.bounds = None
+
+    def invalidate(self, *_):
+        self.pixmap = None
+
+    def draw(
+            self, painter, shapes, viewportmapper, viewport_rect,
+            exposed_rect, device_pixel_ratio=1.0):
+        if not shapes:
+            return
+
+        key = (
+            viewportmapper.zoom, viewport_rect.width(),
+            viewport_rect.height(), device_pixel_ratio,
+            tuple(id(shape) for shape in shapes))
+        if self.pixmap is None or key != self.key:
+            self.bounds = get_combined_rects(
+                [s.bounding_rect() for s in shapes])
+            self.render(
+                shapes, viewportmapper, viewport_rect, device_pixel_ratio)
+            self.key = key
+
+        needed = viewportmapper.to_viewport_rect(self.bounds)
+        needed = needed.intersected(QtCore.QRectF(viewport_rect))
+        if needed.isEmpty():
+            return
+        offset = self.origin - viewportmapper.origin
+        if not self.rect.translated(offset).contains(needed):
+            self.render(
+                shapes, viewportmapper, viewport_rect, device_pixel_ratio)
+            offset = QtCore.QPointF(0, 0)
+
+        rect = self.rect.translated(offset)
+        target = QtCore.QRectF(exposed_rect).intersected(rect)
+        if target.isEmpty():
+            return
+        source = QtCore.QRectF(
+            (target.topLeft() - rect.topLeft()) * device_pixel_ratio,
+            target.size() * device_pixel_ratio)
+        painter.drawPixmap(target, self.pixmap, source)
+
+    def render(
+            self, shapes, viewportmapper, viewport_rect, device_pixel_ratio):
+        width, height = viewport_rect.width(), viewport_rect.height()
+        area = QtCore.QRectF(-width / 2, -height / 2, width * 2, height * 2)
+        bounds = viewportmapper.to_viewport_rect(self.bounds)
+        area = area.intersected(grow_rect(bounds, REPAINT_MARGIN))
+        area = QtCore.QRectF(area.toAlignedRect())
+        self.rect = area
+        self.origin = QtCore.QPointF(viewportmapper.origin)
+        self.pixmap = QtGui.QPixmap(
+            max(1, int(area.width() * device_pixel_ratio)),
+            max(1, int(area.height() * device_pixel_ratio)))
+        self.pixmap.setDevicePixelRatio(device_pixel_ratio)
+        self.pixmap.fill(QtCore.Qt.transparent)
+        if area.isEmpty():
+            return
+
+        mapper = ViewportMapper()
+        mapper.zoom = viewportmapper.zoom
+        mapper.viewsize = viewportmapper.viewsize
+        mapper.origin = viewportmapper.origin + area.topLeft()
+        painter = QtGui.QPainter(self.pixmap)
+        try:
+            painter.setRenderHints(QtGui.QPainter.Antialiasing)
+            for shape in shapes:
+                draw_shape(
+                    painter, shape,
+                    force_world_space=False,
+                    viewportmapper=mapper)
+        finally:
+            painter.end()
+
+
 class PickerStackedView(QtWidgets.QWidget):
 
-    def __init__(self, document=None, editable=True, parent=None):
+    def __init__(self, document=None, editable=True, lazy=False, parent=None):
+        """
+        lazy: the panels are only built when the view is shown the first
+        time (or materialize is called).
+        """
         super(PickerStackedView, self).__init__(parent)
         self.document = document or PickerDocument.create()
         mtd = self.general_option_changed
@@ -108,17 +285,31 @@ class PickerStackedView(QtWidgets.QWidget):
         self.pickers = []
         self.widget = None
         self.last_selected_tab = None
+        self.layers_menu = None
 
-        self.layers_menu = VisibilityLayersMenu(document)
-        self.layers_menu.visibilities_changed.connect(self.update)
-
-        self.as_sub_tab = document.data['general']['panels.as_sub_tab']
+        self.as_sub_tab = self.document.data['general']['panels.as_sub_tab']
         self.layout = QtWidgets.QHBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
         self.setStyleSheet(SPLITTER_STYLE)
+        if not lazy:
+            self.materialize()
+
+    @property
+    def materialized(self):
+        return self.layers_menu is not None
+
+    def materialize(self):
+        if self.materialized:
+            return
+        self.layers_menu = VisibilityLayersMenu(self.document)
+        self.layers_menu.visibilities_changed.connect(self.update)
         self.create_pickers()
         self.create_panels()
 
+    def showEvent(self, event):
+        self.materialize()
+        return super(PickerStackedView, self).showEvent(event)
+
     def register_callbacks(self):
         for picker in self.pickers:
             picker.register_callbacks()
@@ -128,6 +319,9 @@ class PickerStackedView(QtWidgets.QWidget):
             picker.unregister_callbacks()
 
     def reset(self, force_all=False):
+        if not self.materialized:
+            # Panels are reset when shown the first time.
+            return
         if not force_all and not isinstance(self.widget, QtWidgets.QTabWidget):
             for picker in self.pickers:
                 if picker.rect().contains(get_cursor(picker)):
@@ -200,6 +394,8 @@ class PickerStackedView(QtWidgets.QWidget):
         self.last_selected_tab = index
 
     def full_refresh(self):
+        if not self.materialized:
+            return
         panels = self.document.data['general']['panels']
         if count_panels(panels) != len(self.pickers):
             self.create_pickers()
@@ -213,6 +409,9 @@ class PickerStackedView(QtWidgets.QWidget):
             state = self.document.data['general']['panels.as_sub_tab']
             self.as_sub_tab = state
 
+        if not self.materialized:
+            return
+
         if option in ('panels', 'panels.orientation', 'panels.as_sub_tab'):
             ensure_general_options_sanity(self.document.data['general'])
             if count_panels(panels) != len(self.pickers):
@@ -249,8 +448,15 @@ class PickerPanelView(QtWidgets.QWidget):
         self._shown = False
 
         self.document = document
-        self.document.shapes_changed.connect(self.update)
-        self.callbacks = []
+        self.document.shapes_changed.connect(self.shapes_changed)
+        # Set when a Maya selection change happened while the view was
+        # hidden. The sync is then done when the view is shown again.
+        self.selection_dirty = False
+        self.static_layer = StaticLayer()
+        self.document.shapes_changed.connect(self.static_layer.invalidate)
+        self.document.data_changed.connect(self.static_layer.invalidate)
+        image_loader().image_loaded.connect(self.image_loaded)
+        optionvar_notifier().changed.connect(self.optionvar_changed)
         self.panel = panel
         self.auto_center = True
         self.editable = editable
@@ -261,6 +467,9 @@ class PickerPanelView(QtWidgets.QWidget):
         self.setMouseTracking(True)
         self.clicked_shape = None
         self.drag_shapes = []
+        self.profiling_infos = []
+        # Shapes hovered in this view, only those are reset on mouse move.
+        self.hovered_shapes = {}
 
     def copy(self):
         self.unregister_callbacks()
@@ -274,6 +483,8 @@ class PickerPanelView(QtWidgets.QWidget):
         return picker
 
     def showEvent(self, event):
+        if self.selection_dirty:
+            self.sync_with_maya_selection()
         if self._shown:
             return super(PickerPanelView, self).showEvent(event)
         self._shown = True
@@ -284,29 +495,73 @@ class PickerPanelView(QtWidgets.QWidget):
         return self.document.data['general']['panels.zoom_locked'][self.panel]
 
     def register_callbacks(self):
-        self.unregister_callbacks()
-        method = self.sync_with_maya_selection
-        cb = om.MEventMessage.addEventCallback('SelectionChanged', method)
-        self.callbacks.append(cb)
+        dispatcher.register(self.sync_with_maya_selection)
 
     def unregister_callbacks(self):
-        for callback in self.callbacks:
-            om.MMessage.removeCallback(callback)
-            self.callbacks.remove(callback)
+        dispatcher.unregister(self.sync_with_maya_selection)
+
+    def image_loaded(self, image):
+        shapes = [
+            s for s in self.document.shapes_from_image(image)
+            if s.options['panel'] == self.panel]
+        if not shapes:
+            return
+        if any(is_static_shape(s) for s in shapes):
+            self.static_layer.invalidate()
+        if self.isVisible():
+            self.update_shapes(shapes)
+
+    def optionvar_changed(self, optionvar, _):
+        if optionvar == DISPLAY_HIERARCHY_IN_PICKER and self.isVisible():
+            self.update()
+
+    def shapes_changed(self):
+        # Hidden views are fully repainted when shown.
+        if self.isVisible():
+            self.update()
 
-    def sync_with_maya_selection(self, *_):
-        if not cmds.optionVar(query=SYNCHRONYZE_SELECTION):
+    @probe('selection_sync')
+    def sync_with_maya_selection(self, selection=None):
+        if not get_optionvar(SYNCHRONYZE_SELECTION):
             return
+        if not self.isVisible():
+            self.selection_dirty = True
+            return
+        self.selection_dirty = False
         shapes = self.document.shapes_by_panel[self.panel]
-        select_shapes_from_selection(shapes)
+        select_shapes_from_selection(
+            shapes, self.document.targets_index(), selection)
         self.update()
 
     def visible_shapes(self):
-            return [
-            s for s in self.document.shapes_by_panel[self.panel] if
+        return self.filter_visible_shapes(
+            self.document.shapes_by_panel[self.panel])
+
+    def filter_visible_shapes(self, shapes):
+        return [
+            s for s in shapes if
             not s.visibility_layer()
             or s.visibility_layer() not in self.layers_menu.hidden_layers]
 
+    def filter_hoverable_shapes(self, shapes):
+        shapes = [s for s in shapes if s.options['panel'] == self.panel]
+        return self.filter_visible_shapes(shapes)
+
+    def track_hovered_shapes(self, shapes):
+        for shape in shapes:
+            if shape.hovered:
+                self.hovered_shapes[id(shape)] = shape
+            else:
+                self.hovered_shapes.pop(id(shape), None)
+
+    def visible_shapes_at(self, world_cursor):
+        index = self.document.spatial_index(self.panel)
+        return self.filter_visible_shapes(index.shapes_at(world_cursor))
+
+    def visible_shapes_in_rect(self, unit_rect):
+        index = self.document.spatial_index(self.panel)
+        return self.filter_visible_shapes(index.shapes_in_rect(unit_rect))
+
     def reset(self, viewsize=None, selection_only=True):
         shapes = [
             s for s in self.visible_shapes() if
@@ -350,6 +605,7 @@ class PickerPanelView(QtWidgets.QWidget):
     def leaveEvent(self, _):
         for shape in self.visible_shapes():
             shape.hovered = False
+        self.hovered_shapes = {}
         self.update()
 
     def mousePressEvent(self, event):
@@ -359,7 +615,7 @@ class PickerPanelView(QtWidgets.QWidget):
             align_shapes_on_line(self.drag_shapes, pos, pos)
 
         world_cursor = self.viewportmapper.to_units_coords(event.pos())
-        shapes = self.visible_shapes()
+        shapes = self.visible_shapes_at(world_cursor)
         self.clicked_shape = detect_hovered_shape(
             shapes=shapes,
             world_cursor=world_cursor.toPoint(),
@@ -376,7 +632,7 @@ class PickerPanelView(QtWidgets.QWidget):
 
     def mouseDoubleClickEvent(self, event):
         world_cursor = self.viewportmapper.to_units_coords(event.pos())
-        shapes = self.visible_shapes()
+        shapes = self.visible_shapes_at(world_cursor)
         clicked_shape = detect_hovered_shape(
             shapes=shapes,
             world_cursor=world_cursor.toPoint(),
@@ -392,6 +648,7 @@ class PickerPanelView(QtWidgets.QWidget):
         shapes = self.document.all_children(clicked_shape.options['id'])
         for shape in shapes:
             shape.hovered = True
+        self.track_hovered_shapes(shapes)
         select_targets(self.visible_shapes(), selection_mode=selection_mode)
 
     def mouseReleaseEvent(self, event):
@@ -403,7 +660,7 @@ class PickerPanelView(QtWidgets.QWidget):
         shapes = self.visible_shapes()
 
         hovered_shape = detect_hovered_shape(
-            shapes=shapes,
+            shapes=self.visible_shapes_at(world_cursor),
             world_cursor=world_cursor.toPoint(),
             screen_cursor=event.pos(),
             viewportmapper=self.viewportmapper)
@@ -488,21 +745,39 @@ class PickerPanelView(QtWidgets.QWidget):
         vector = relcursor - reference
         self.viewportmapper.origin = self.viewportmapper.origin + vector
 
+    def update_shapes(self, shapes):
+        for shape in shapes:
+            rect = get_shape_viewport_rect(shape, self.viewportmapper)
+            self.update(rect.toAlignedRect())
+
     def mouseMoveEvent(self, event):
         world_cursor=self.viewportmapper.to_units_coords(event.pos())
+        if self.selection_square.rect:
+            previous_selection_rect = QtCore.QRectF(self.selection_square.rect)
+        else:
+            previous_selection_rect = None
         selection_rect = (
             self.selection_square.rect or
             QtCore.QRectF(world_cursor, world_cursor))
         unit_selection_rect = self.viewportmapper.to_units_rect(selection_rect)
         unit_selection_rect = unit_selection_rect.toRect()
+        if self.selection_square.rect:
+            candidates = self.visible_shapes_in_rect(unit_selection_rect)
+        else:
+            candidates = self.visible_shapes_at(world_cursor)
 
-        set_shapes_hovered(
-            shapes=self.visible_shapes(),
+        changed = set_shapes_hovered(
+            shapes=None,
             world_cursor=world_cursor,
             viewport_cursor=event.pos(),
             selection_rect=unit_selection_rect,
             viewport_selection_rect=selection_rect,
-            viewportmapper=self.viewportmapper)
+            viewportmapper=self.viewportmapper,
+            candidates=candidates,
+            document=self.document,
+            hovered_shapes=list(self.hovered_shapes.values()),
+            shape_filter=self.filter_hoverable_shapes)
+        self.track_hovered_shapes(changed)
 
         if self.interaction_manager.mode == InteractionManager.DRAGGING:
             point1 = self.viewportmapper.to_units_coords(
@@ -515,14 +790,18 @@ class PickerPanelView(QtWidgets.QWidget):
             if not self.selection_square.handeling:
                 self.selection_square.clicked(event.pos())
             self.selection_square.handle(event.pos())
-            return self.update()
+            rect = self.selection_square.rect.normalized()
+            if previous_selection_rect is not None:
+                rect = rect.united(previous_selection_rect.normalized())
+            self.update(grow_rect(rect, REPAINT_MARGIN).toAlignedRect())
+            return self.update_shapes(changed)
 
         elif self.interaction_manager.mode == InteractionManager.ZOOMING:
             if self.zoom_locked:
                 return self.update()
             offset = self.interaction_manager.mouse_offset(event.pos())
             if offset is not None and self.interaction_manager.zoom_anchor:
-                sensitivity = float(cmds.optionVar(query=ZOOM_SENSITIVITY))
+                sensitivity = float(get_optionvar(ZOOM_SENSITIVITY))
                 factor = (offset.x() + offset.y()) / sensitivity
                 self.zoom(factor, self.interaction_manager.zoom_anchor)
             return self.update()
@@ -533,13 +812,13 @@ class PickerPanelView(QtWidgets.QWidget):
                 self.viewportmapper.origin = (
                     self.viewportmapper.origin - offset)
             return self.update()
-        self.update()
+        self.update_shapes(changed)
 
     def call_context_menu(self):
         screen_cursor = get_cursor(self)
         world_cursor = self.viewportmapper.to_units_coords(screen_cursor)
         shape = detect_hovered_shape(
-            self.visible_shapes(), world_cursor, screen_cursor,
+            self.visible_shapes_at(world_cursor), world_cursor, screen_cursor,
             self.viewportmapper)
 
         global_commands = self.document.data['general']['menu_commands']
@@ -587,8 +866,9 @@ class PickerPanelView(QtWidgets.QWidget):
             print(traceback.format_exc())
 
     def update_button(self, shape):
-        shape.set_targets(cmds.ls(selection=True))
+        self.document.set_shape_targets(shape, cmds.ls(selection=True))
         self.document.record_undo()
+        self.document.shapes_changed.emit()
 
     def delete_buttons(self):
         selected_shapes = [s for s in self.document.shapes if s.selected]
@@ -599,11 +879,11 @@ class PickerPanelView(QtWidgets.QWidget):
     def get_quick_options(self):
 
         return {
-            'bgcolor.normal': cmds.optionVar(query=DEFAULT_BG_COLOR),
-            'text.color': cmds.optionVar(query=DEFAULT_TEXT_COLOR),
-            'shape.width': cmds.optionVar(query=DEFAULT_WIDTH),
-            'shape.height': cmds.optionVar(query=DEFAULT_HEIGHT),
-            'text.content': cmds.optionVar(query=DEFAULT_LABEL)}
+            'bgcolor.normal': get_optionvar(DEFAULT_BG_COLOR),
+            'text.color': get_optionvar(DEFAULT_TEXT_COLOR),
+            'shape.width': get_optionvar(DEFAULT_WIDTH),
+            'shape.height': get_optionvar(DEFAULT_HEIGHT),
+            'text.content': get_optionvar(DEFAULT_LABEL)}
 
     def add_button(self, position, button_type=0):
         """
@@ -640,7 +920,7 @@ class PickerPanelView(QtWidgets.QWidget):
             shape_data['text.content'] = text
             command = deepcopy(COMMAND)
             languages = ['python', 'mel']
-            language = languages[cmds.optionVar(query=LAST_COMMAND_LANGUAGE)]
+            language = languages[get_optionvar(LAST_COMMAND_LANGUAGE)]
             command['language'] = language
             dialog = CommandEditorDialog(command)
             if not dialog.exec_():
@@ -659,7 +939,9 @@ class PickerPanelView(QtWidgets.QWidget):
         self.document.record_undo()
         self.document.shapes_changed.emit()
 
-    def paintEvent(self, _):
+    @probe('paint')
+    def paintEvent(self, event):
+        start = clock()
         try:
             painter = QtGui.QPainter()
             painter.begin(self)
@@ -674,13 +956,26 @@ class PickerPanelView(QtWidgets.QWidget):
             if self.rect().contains(get_cursor(self)):
                 draw_picker_focus(painter, self.rect())
 
-            # List renderable shapes.
+            # List renderable shapes. Only the shapes intersecting the
+            # repainted area are drawn.
             painter.setRenderHints(QtGui.QPainter.Antialiasing)
             hidden_layers = self.layers_menu.hidden_layers
-            shapes = [
-                shape for shape in self.document.shapes_by_panel[self.panel] if
-                not shape.visibility_layer() or
-                shape.visibility_layer() not in hidden_layers]
+            rect = grow_rect(QtCore.QRectF(event.rect()), REPAINT_MARGIN)
+            rect = self.viewportmapper.to_units_rect(rect)
+            shapes = self.visible_shapes_in_rect(rect)
+
+            # Draw the static bottom shapes from the cached layer.
+            static_shapes = list_static_shapes(
+                self.document.shapes_by_panel[self.panel], hidden_layers)
+            self.static_layer.draw(
+                painter, static_shapes,
+                viewportmapper=self.viewportmapper,
+                viewport_rect=self.rect(),
+                exposed_rect=event.rect(),
+                device_pixel_ratio=self.devicePixelRatioF())
+            static_count = len(static_shapes)
+            static_shapes = {id(shape) for shape in static_shapes}
+            shapes = [s for s in shapes if id(s) not in static_shapes]
             if self.interaction_manager.left_click_pressed:
                 shapes.extend(self.drag_shapes)
 
@@ -698,8 +993,8 @@ class PickerPanelView(QtWidgets.QWidget):
 
             # Draw hierarchy connections.
             connections_path = QtGui.QPainterPath()
-            if cmds.optionVar(query=DISPLAY_HIERARCHY_IN_PICKER):
-                for shape in shapes:
+            if get_optionvar(DISPLAY_HIERARCHY_IN_PICKER):
+                for shape in self.visible_shapes():
                     if shape.options['shape.space'] == 'screen':
                         continue
                     for child in shape.options['children']:
@@ -725,6 +1020,11 @@ class PickerPanelView(QtWidgets.QWidget):
                 draw_selection_square(
                     painter, self.selection_square.rect)
 
+            if overlay_visible():
+                self.draw_profiling_overlay(
+                    painter, event.rect(), clock() - start, len(shapes),
+                    static_count)
+
         except BaseException as e:
             import traceback
             print(traceback.format_exc())
@@ -735,6 +1035,22 @@ class PickerPanelView(QtWidgets.QWidget):
             painter.end()
 
 
+    def draw_profiling_overlay(
+            self, painter, exposed_rect, frame_time, drawn, static):
+        # A partial repaint also repaints the overlay to keep it up to date.
+        # This overlay only repaint doesn't update the displayed values.
+        if exposed_rect != PROFILING_OVERLAY_RECT:
+            culled = len(self.visible_shapes()) - drawn - static
+            self.profiling_infos = [
+                'Frame time: {:.2f} ms'.format(frame_time * 1000),
+                'Shapes drawn: {} ({} cached)'.format(drawn + static, static),
+                'Shapes culled: {}'.format(max(0, culled))]
+        if not exposed_rect.contains(PROFILING_OVERLAY_RECT):
+            self.update(PROFILING_OVERLAY_RECT)
+        draw_profiling_overlay(
+            painter, PROFILING_OVERLAY_RECT, self.profiling_infos)
+
+
 class CommandAction(QtWidgets.QAction):
     def __init__(self, command, parent=None):
         super(CommandAction, self).__init__(command['caption'], parent)
@@ -1,22 +1,24 @@
 import os
 from dwpicker.pyside import QtWidgets, QtCore
-from maya import cmds
 from dwpicker.hotkeyseditor import HotkeysEditor
 from dwpicker.optionvar import (
-    save_optionvar,
+    get_optionvar, optionvar_notifier, save_optionvar,
     AUTO_COLLAPSE_IMG_PATH_FROM_ENV, AUTO_FOCUS_BEHAVIOR,
     AUTO_RESIZE_NAMESPACE_COMBO, AUTO_SET_NAMESPACE, AUTO_FOCUS_BEHAVIORS,
     AUTO_SWITCH_TAB, CHECK_IMAGES_PATHS, CUSTOM_PROD_PICKER_DIRECTORY,
     CHECK_FOR_UPDATE, DISPLAY_QUICK_OPTIONS, DISABLE_IMPORT_CALLBACKS,
     OVERRIDE_PROD_PICKER_DIRECTORY_ENV, INSERT_TAB_AFTER_CURRENT,
-    NAMESPACE_TOOLBAR, SYNCHRONYZE_SELECTION, TRIGGER_REPLACE_ON_MIRROR,
-    USE_BASE64_DATA_ENCODING, USE_PROD_PICKER_DIR_AS_DEFAULT,
+    NAMESPACE_TOOLBAR, SELECTION_SYNC_LATENCY, SYNCHRONYZE_SELECTION,
+    TRIGGER_REPLACE_ON_MIRROR,
+    USE_BASE64_DATA_ENCODING, USE_COMPRESSED_DATA_CHUNKS,
+    USE_PROD_PICKER_DIR_AS_DEFAULT,
     USE_ICON_FOR_UNSAVED_TAB, WARN_ON_TAB_CLOSED, ZOOM_SENSITIVITY,
     ZOOM_BUTTON, ZOOM_BUTTONS)
 from dwpicker.path import unix_path
 
 
 MAX_SENSITIVITY = 500
+MAX_SELECTION_SYNC_LATENCY = 2000
 AUTO_FOCUSES = {
     'Disable': AUTO_FOCUS_BEHAVIORS[0],
     'Bilateral': AUTO_FOCUS_BEHAVIORS[1],
@@ -49,6 +51,8 @@ class GeneralPreferences(QtWidgets.QWidget):
     def __init__(self, callback=None, parent=None):
         super(GeneralPreferences, self).__init__(parent)
         self.callback = callback
+        self.loading = False
+        self.saving = False
 
         text = "Display namespace toolbar."
         self.namespace_toolbar = QtWidgets.QCheckBox(text)
@@ -118,6 +122,11 @@ class GeneralPreferences(QtWidgets.QWidget):
         self.data_group = QtWidgets.QGroupBox("Data")
         self.data_layout = QtWidgets.QVBoxLayout(self.data_group)
         self.data_layout.addWidget(self.use_base64_encoding)
+        text = (
+            "Store in-scene data compressed, one chunk per picker.\n"
+            "(Faster with many pickers, unreadable by older versions)")
+        self.use_compressed_chunks = QtWidgets.QCheckBox(text)
+        self.data_layout.addWidget(self.use_compressed_chunks)
 
         self.auto_focus = QtWidgets.QComboBox()
         self.auto_focus.addItems(list(AUTO_FOCUSES))
@@ -145,6 +154,19 @@ class GeneralPreferences(QtWidgets.QWidget):
         self.zoom_layout.addRow("Sensitivity", self.zoom_sensitivity)
         self.zoom_layout.addRow("Mouse button", self.zoom_button)
 
+        self.selection_sync_latency = QtWidgets.QSpinBox()
+        self.selection_sync_latency.setMaximum(MAX_SELECTION_SYNC_LATENCY)
+        self.selection_sync_latency.setSuffix(' ms')
+        msg = (
+            'Selection changes are gathered and applied to the pickers at '
+            'most this long after the first change.')
+        self.selection_sync_latency.setToolTip(msg)
+
+        self.selection_group = QtWidgets.QGroupBox("Selection synchronization")
+        self.selection_layout = QtWidgets.QFormLayout(self.selection_group)
+        self.selection_layout.addRow(
+            "Maximum latency", self.selection_sync_latency)
+
         msg = "Check for new version at startup."
         self.check_for_update = QtWidgets.QCheckBox(msg)
         self.update_group = QtWidgets.QGroupBox("Update check")
@@ -159,6 +181,7 @@ class GeneralPreferences(QtWidgets.QWidget):
         self.sublayout.addWidget(self.focus_group)
         self.sublayout.addWidget(self.advanced_group)
         self.sublayout.addWidget(self.zoom_group)
+        self.sublayout.addWidget(self.selection_group)
         self.sublayout.addWidget(self.update_group)
 
         scroll = QtWidgets.QScrollArea()
@@ -187,64 +210,93 @@ class GeneralPreferences(QtWidgets.QWidget):
         self.quick_options.released.connect(self.save_ui_states)
         self.namespace_toolbar.released.connect(self.save_ui_states)
         self.use_base64_encoding.released.connect(self.save_ui_states)
+        self.use_compressed_chunks.released.connect(self.save_ui_states)
         self.unsaved_tab_icon.released.connect(self.save_ui_states)
         self.sychronize.released.connect(self.save_ui_states)
         self.search_on_mirror.released.connect(self.save_ui_states)
         self.warn_on_tab_close.released.connect(self.save_ui_states)
         self.zoom_sensitivity.valueChanged.connect(self.save_ui_states)
         self.zoom_button.currentIndexChanged.connect(self.save_ui_states)
+        self.selection_sync_latency.valueChanged.connect(self.save_ui_states)
+        optionvar_notifier().changed.connect(self.optionvar_changed)
 
     def sizeHint(self):
         return QtCore.QSize(520, 600)
 
     def load_ui_states(self):
-        state = bool(cmds.optionVar(query=AUTO_COLLAPSE_IMG_PATH_FROM_ENV))
+        state = bool(get_optionvar(AUTO_COLLAPSE_IMG_PATH_FROM_ENV))
         self.auto_collapse_path.setChecked(state)
-        value = cmds.optionVar(query=AUTO_FOCUS_BEHAVIOR)
+        value = get_optionvar(AUTO_FOCUS_BEHAVIOR)
         text = {v: k for k, v in AUTO_FOCUSES.items()}[value]
         self.auto_focus.setCurrentText(text)
-        state = bool(cmds.optionVar(query=AUTO_RESIZE_NAMESPACE_COMBO))
+        state = bool(get_optionvar(AUTO_RESIZE_NAMESPACE_COMBO))
         self.auto_resize_namespace_combo.setChecked(state)
-        state = bool(cmds.optionVar(query=AUTO_SET_NAMESPACE))
+        state = bool(get_optionvar(AUTO_SET_NAMESPACE))
         self.autoswitch_namespace.setChecked(state)
-        state = bool(cmds.optionVar(query=AUTO_SWITCH_TAB))
+        state = bool(get_optionvar(AUTO_SWITCH_TAB))
         self.autoswitch_tab.setChecked(state)
-        state = bool(cmds.optionVar(query=DISABLE_IMPORT_CALLBACKS))
+        state = bool(get_optionvar(DISABLE_IMPORT_CALLBACKS))
         self.disable_import_callbacks.setChecked(state)
-        value = cmds.optionVar(query=CUSTOM_PROD_PICKER_DIRECTORY)
+        value = get_optionvar(CUSTOM_PROD_PICKER_DIRECTORY)
         self.custom_prod_path.setText(value)
-        state = bool(cmds.optionVar(query=CHECK_IMAGES_PATHS))
+        state = bool(get_optionvar(CHECK_IMAGES_PATHS))
         self.check_images_paths.setChecked(state)
-        state = bool(cmds.optionVar(query=CHECK_FOR_UPDATE))
+        state = bool(get_optionvar(CHECK_FOR_UPDATE))
         self.check_for_update.setChecked(state)
-        state = bool(cmds.optionVar(query=USE_PROD_PICKER_DIR_AS_DEFAULT))
+        state = bool(get_optionvar(USE_PROD_PICKER_DIR_AS_DEFAULT))
         self.force_file_dialog_directory.setChecked(state)
-        state = bool(cmds.optionVar(query=OVERRIDE_PROD_PICKER_DIRECTORY_ENV))
+        state = bool(get_optionvar(OVERRIDE_PROD_PICKER_DIRECTORY_ENV))
         self.override_variable.setChecked(state)
         self.custom_prod_path.setEnabled(state)
-        state = bool(cmds.optionVar(query=NAMESPACE_TOOLBAR))
+        state = bool(get_optionvar(NAMESPACE_TOOLBAR))
         self.namespace_toolbar.setChecked(state)
-        state = bool(cmds.optionVar(query=DISPLAY_QUICK_OPTIONS))
+        state = bool(get_optionvar(DISPLAY_QUICK_OPTIONS))
         self.quick_options.setChecked(state)
-        state = bool(cmds.optionVar(query=SYNCHRONYZE_SELECTION))
+        state = bool(get_optionvar(SYNCHRONYZE_SELECTION))
         self.sychronize.setChecked(state)
-        state = bool(cmds.optionVar(query=USE_BASE64_DATA_ENCODING))
+        state = bool(get_optionvar(USE_BASE64_DATA_ENCODING))
         self.use_base64_encoding.setChecked(state)
-        state = bool(cmds.optionVar(query=USE_ICON_FOR_UNSAVED_TAB))
+        state = bool(get_optionvar(USE_COMPRESSED_DATA_CHUNKS))
+        self.use_compressed_chunks.setChecked(state)
+        state = bool(get_optionvar(USE_ICON_FOR_UNSAVED_TAB))
         self.unsaved_tab_icon.setChecked(state)
-        state = bool(cmds.optionVar(query=WARN_ON_TAB_CLOSED))
+        state = bool(get_optionvar(WARN_ON_TAB_CLOSED))
         self.warn_on_tab_close.setChecked(state)
-        state = bool(cmds.optionVar(query=INSERT_TAB_AFTER_CURRENT))
+        state = bool(get_optionvar(INSERT_TAB_AFTER_CURRENT))
         self.insert_after_current.setChecked(state)
-        state = bool(cmds.optionVar(query=TRIGGER_REPLACE_ON_MIRROR))
+        state = bool(get_optionvar(TRIGGER_REPLACE_ON_MIRROR))
         self.search_on_mirror.setChecked(state)
 
-        value = MAX_SENSITIVITY - cmds.optionVar(query=ZOOM_SENSITIVITY)
+        value = MAX_SENSITIVITY - get_optionvar(ZOOM_SENSITIVITY)
         self.zoom_sensitivity.setSliderPosition(value)
-        value = cmds.optionVar(query=ZOOM_BUTTON)
+        value = get_optionvar(ZOOM_BUTTON)
         self.zoom_button.setCurrentText(value)
+        value = get_optionvar(SELECTION_SYNC_LATENCY)
+        self.selection_sync_latency.setValue(value)
+
+    def optionvar_changed(self, *_):
+        # Reflect the options saved outside of this window. The widgets
+        # changes must not be saved back while loading.
+        if self.saving:
+            return
+        self.loading = True
+        try:
+            self.load_ui_states()
+        finally:
+            self.loading = False
 
     def save_ui_states(self, *_):
+        if self.loading:
+            return
+        self.saving = True
+        try:
+            self.save_optionvars()
+        finally:
+            self.saving = False
+        if self.callback:
+            self.callback()
+
+    def save_optionvars(self):
         value = int(self.auto_collapse_path.isChecked())
         save_optionvar(AUTO_COLLAPSE_IMG_PATH_FROM_ENV, value)
         value = AUTO_FOCUSES[self.auto_focus.currentText()]
@@ -276,14 +328,18 @@ class GeneralPreferences(QtWidgets.QWidget):
         save_optionvar(NAMESPACE_TOOLBAR, value)
         value = int(self.use_base64_encoding.isChecked())
         save_optionvar(USE_BASE64_DATA_ENCODING, value)
+        value = int(self.use_compressed_chunks.isChecked())
+        save_optionvar(USE_COMPRESSED_DATA_CHUNKS, value)
         value = int(self.unsaved_tab_icon.isChecked())
         save_optionvar(USE_ICON_FOR_UNSAVED_TAB, value)
         value = int(self.search_on_mirror.isChecked())
         save_optionvar(TRIGGER_REPLACE_ON_MIRROR, value)
+        value = int(self.sychronize.isChecked())
+        save_optionvar(SYNCHRONYZE_SELECTION, value)
         value = int(self.warn_on_tab_close.isChecked())
         save_optionvar(WARN_ON_TAB_CLOSED, value)
         save_optionvar(ZOOM_BUTTON, self.zoom_button.currentText())
         value = MAX_SENSITIVITY - int(self.zoom_sensitivity.value()) + 1
         save_optionvar(ZOOM_SENSITIVITY, value)
-        if self.callback:
-            self.callback()
+        value = int(self.selection_sync_latency.value())
+        save_optionvar(SELECTION_SYNC_LATENCY, value)
@@ -0,0 +1,94 @@
+"""
+Timing probes set around the picker hot paths (paint, hover, selection,
+commands ...). They are disabled by default and only cost a flag check.
+The statistics are exposed through dwpicker.profiling_statistics().
+"""
+import time
+from collections import deque
+from functools import wraps
+
+
+# Number of durations kept per probe to compute the statistics.
+MAX_SAMPLES = 1000
+clock = getattr(time, 'perf_counter', time.time)
+
+
+class Probe():
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, duration):
+        self.count += 1
+        self.samples.append(duration)
+
+    def statistics(self):
+        """
+        Durations are given in milliseconds, computed on the last samples.
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return {'count': self.count, 'mean': 0, 'p95': 0, 'max': 0}
+        p95 = samples[min(len(samples) - 1, int(len(samples) * .95))]
+        return {
+            'count': self.count,
+            'mean': sum(samples) / len(samples) * 1000,
+            'p95': p95 * 1000,
+            'max': samples[-1] * 1000}
+
+
+_enabled = False
+_overlay_visible = False
+_probes = {}
+
+
+def profiling_enabled():
+    return _enabled
+
+
+def enable_profiling(state=True):
+    global _enabled
+    _enabled = state
+
+
+def overlay_visible():
+    return _overlay_visible
+
+
+def set_overlay_visible(state=True):
+    global _overlay_visible
+    _overlay_visible = state
+
+
+def record(name, duration):
+    if name not in _probes:
+        _probes[name] = Probe(name)
+    _probes[name].add(duration)
+
+
+def probe(name):
+    """
+    Decorator timing each call of the function when the profiling is
+    enabled.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, clock() - start)
+        return wrapper
+    return decorator
+
+
+def statistics():
+    return {name: probe.statistics() for name, probe in _probes.items()}
+
+
+def reset_probes():
+    _probes.clear()
@@ -1,10 +1,9 @@
 from dwpicker.pyside import QtWidgets, QtGui, QtCore
-from maya import cmds
 
 from dwpicker.colorwheel import ColorDialog
 from dwpicker.optionvar import (
-    save_optionvar, DEFAULT_LABEL, DEFAULT_HEIGHT, DEFAULT_WIDTH,
-    DEFAULT_TEXT_COLOR, DEFAULT_BG_COLOR)
+    get_optionvar, save_optionvar, DEFAULT_LABEL, DEFAULT_HEIGHT,
+    DEFAULT_WIDTH, DEFAULT_TEXT_COLOR, DEFAULT_BG_COLOR)
 
 
 class QuickOptions(QtWidgets.QWidget):
@@ -53,11 +52,11 @@ class QuickOptions(QtWidgets.QWidget):
 
     def load_ui_states(self):
         self.values = {
-            'bgcolor.normal': cmds.optionVar(query=DEFAULT_BG_COLOR),
-            'text.color': cmds.optionVar(query=DEFAULT_TEXT_COLOR),
-            'shape.width': cmds.optionVar(query=DEFAULT_WIDTH),
-            'shape.height': cmds.optionVar(query=DEFAULT_HEIGHT),
-            'text.content': cmds.optionVar(query=DEFAULT_LABEL)}
+            'bgcolor.normal': get_optionvar(DEFAULT_BG_COLOR),
+            'text.color': get_optionvar(DEFAULT_TEXT_COLOR),
+            'shape.width': get_optionvar(DEFAULT_WIDTH),
+            'shape.height': get_optionvar(DEFAULT_HEIGHT),
+            'text.content': get_optionvar(DEFAULT_LABEL)}
 
     @property
     def values(self):
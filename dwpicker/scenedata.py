@@ -1,18 +1,30 @@
 import base64
+import hashlib
 import json
 import re
 import sys
+import zlib
+from collections import OrderedDict
 
 from maya import cmds
+import maya.OpenMaya as om
 
 from dwpicker.compatibility import ensure_retro_compatibility
 from dwpicker.namespace import maya_namespace, node_full_namespace
-from dwpicker.optionvar import USE_BASE64_DATA_ENCODING
+from dwpicker.optionvar import (
+    USE_BASE64_DATA_ENCODING, USE_COMPRESSED_DATA_CHUNKS, get_optionvar)
+from dwpicker.profiling import probe
 
 
 PICKER_HOLDER_NODE = '_dwpicker_data'
 PICKER_HOLDER_ATTRIBUTE = '_dwpicker_data'
 LS_EXP = ["*." + PICKER_HOLDER_ATTRIBUTE, "*:*." + PICKER_HOLDER_ATTRIBUTE]
+CHUNK_ATTRIBUTE = PICKER_HOLDER_ATTRIBUTE + '_chunk{}'
+CHUNKS_FORMAT = 'zlib_chunks'
+
+
+# Chunk hash by document revision of the last store.
+_chunk_hashes = {}
 
 
 def get_picker_holder_node():
@@ -31,21 +43,105 @@ def create_picker_holder_node():
     return node
 
 
-def store_local_picker_data(pickers):
-    data = encode_data(pickers)
+@probe('store')
+def store_local_picker_data(pickers, revisions=None):
+    """
+    revisions: revision of the document of each picker (see
+    PickerDocument.revision). With the compressed chunks, the pickers whose
+    revision was already stored are neither encoded nor hashed again.
+    """
     node = get_picker_holder_node()
-    cmds.setAttr(node + '.' + PICKER_HOLDER_ATTRIBUTE, data, type='string')
+    if get_optionvar(USE_COMPRESSED_DATA_CHUNKS):
+        store_picker_data_chunks(node, pickers, revisions)
+    else:
+        data = encode_data(pickers)
+        cmds.setAttr(
+            node + '.' + PICKER_HOLDER_ATTRIBUTE, data, type='string')
+        remove_picker_data_chunks(node)
     clean_stray_picker_holder_nodes()
 
 
-def load_local_picker_data():
-    nodes = list_picker_holder_nodes()
+def store_picker_data_chunks(node, pickers, revisions=None):
+    """
+    Store each picker compressed in its own attribute. The main attribute
+    holds a manifest listing the hash of each chunk, only the chunks which
+    changed are encoded and written.
+    revisions: see store_local_picker_data.
+    """
+    manifest = read_chunks_manifest(node) or {}
+    stored_hashes = manifest.get('hashes', [])
+    revisions = revisions or [None] * len(pickers)
+    hashes = []
+    chunk_hashes = {}
+    for i, (picker, revision) in enumerate(zip(pickers, revisions)):
+        data = None
+        hash_ = _chunk_hashes.get(revision)
+        if hash_ is None:
+            data = json.dumps(picker)
+            hash_ = hashlib.sha1(data.encode('utf-8')).hexdigest()
+        if revision is not None:
+            chunk_hashes[revision] = hash_
+        hashes.append(hash_)
+        if i < len(stored_hashes) and stored_hashes[i] == hash_:
+            continue
+        data = data or json.dumps(picker)
+        attribute = CHUNK_ATTRIBUTE.format(i)
+        if not cmds.attributeQuery(attribute, node=node, exists=True):
+            cmds.addAttr(node, longName=attribute, dataType='string')
+        cmds.setAttr(
+            node + '.' + attribute, encode_chunk(data), type='string')
+
+    # Only the revisions currently opened are kept.
+    _chunk_hashes.clear()
+    _chunk_hashes.update(chunk_hashes)
+    remove_picker_data_chunks(node, start=len(pickers))
+    manifest = json.dumps({'format': CHUNKS_FORMAT, 'hashes': hashes})
+    cmds.setAttr(
+        node + '.' + PICKER_HOLDER_ATTRIBUTE, manifest, type='string')
+
+
+def remove_picker_data_chunks(node, start=0):
+    i = start
+    attribute = CHUNK_ATTRIBUTE.format(i)
+    while cmds.attributeQuery(attribute, node=node, exists=True):
+        cmds.deleteAttr(node, attribute=attribute)
+        i += 1
+        attribute = CHUNK_ATTRIBUTE.format(i)
+
+
+def read_chunks_manifest(node):
+    data = cmds.getAttr(node + '.' + PICKER_HOLDER_ATTRIBUTE)
+    if not data or not data.startswith('{'):
+        return None
+    manifest = json.loads(data)
+    if manifest.get('format') != CHUNKS_FORMAT:
+        return None
+    return manifest
+
+
+def read_picker_holder_data(node):
+    manifest = read_chunks_manifest(node)
+    if manifest is None:
+        data = cmds.getAttr(node + '.' + PICKER_HOLDER_ATTRIBUTE)
+        return decode_data(data) if data else []
+    return [
+        decode_chunk(cmds.getAttr(node + '.' + CHUNK_ATTRIBUTE.format(i)))
+        for i in range(len(manifest['hashes']))]
+
+
+@probe('load')
+def load_local_picker_data(nodes=None):
+    """
+    nodes: holder nodes to read, all the scene holder nodes by default.
+    """
+    if nodes is None:
+        nodes = list_picker_holder_nodes()
     pickers = []
     for node in nodes:
-        data = cmds.getAttr(node + '.' + PICKER_HOLDER_ATTRIBUTE)
+        data = read_picker_holder_data(node)
         if not data:
             continue
-        data = [ensure_retro_compatibility(p) for p in decode_data(data)]
+        data = [ensure_retro_compatibility(p) for p in data]
         namespace = node_full_namespace(node)
         if namespace:
             # holder node would have namespace when it is referenced
@@ -61,7 +157,7 @@ def load_local_picker_data():
 
 def encode_data(pickers):
     data = json.dumps(pickers)
-    if not cmds.optionVar(query=USE_BASE64_DATA_ENCODING):
+    if not get_optionvar(USE_BASE64_DATA_ENCODING):
         return data
     # Ensure backward compatibility.
     if sys.version_info[0] == 2:
@@ -69,6 +165,15 @@ def encode_data(pickers):
     return base64.b64encode(bytes(data, "utf-8"))
 
 
+def encode_chunk(data):
+    data = zlib.compress(data.encode('utf-8'))
+    return base64.b64encode(data).decode('ascii')
+
+
+def decode_chunk(data):
+    return json.loads(zlib.decompress(base64.b64decode(data)).decode('utf-8'))
+
+
 def decode_data(data):
     try:
         return json.loads(data)
@@ -76,6 +181,109 @@ def decode_data(data):
         return json.loads(base64.b64decode(data))
 
 
+class HolderNodeRegistry():
+    """
+    Keep track of the picker holder nodes to avoid a scene wide wildcard
+    ls each time they are listed.
+    While its callbacks are registered, the registry follows the script
+    nodes created and deleted. The attribute is added after the node
+    creation, so the nodes are only filtered when listed. Without
+    callbacks or once invalidated (scene open or new), the next listing
+    falls back on a full scan.
+    """
+    def __init__(self):
+        self.callbacks = []
+        self.handles = None
+
+    def register_callbacks(self):
+        if self.callbacks:
+            return
+        self.invalidate()
+        self.callbacks = [
+            om.MDGMessage.addNodeAddedCallback(self.node_added, 'script'),
+            om.MDGMessage.addNodeRemovedCallback(
+                self.node_removed, 'script'),
+            om.MSceneMessage.addCallback(
+                om.MSceneMessage.kBeforeOpen, self.invalidate),
+            om.MSceneMessage.addCallback(
+                om.MSceneMessage.kBeforeNew, self.invalidate)]
+
+    def unregister_callbacks(self):
+        for callback in self.callbacks:
+            om.MMessage.removeCallback(callback)
+        self.callbacks = []
+        self.invalidate()
+
+    def invalidate(self, *_):
+        self.handles = None
+
+    def node_added(self, node, *_):
+        if self.handles is None:
+            return
+        handle = om.MObjectHandle(node)
+        self.handles[handle.hashCode()] = handle
+
+    def node_removed(self, node, *_):
+        if self.handles is None:
+            return
+        self.handles.pop(om.MObjectHandle(node).hashCode(), None)
+
+    def scan(self):
+        self.handles = OrderedDict()
+        for plug in cmds.ls(LS_EXP):
+            self.node_added(get_node_handle(plug.split('.')[0]).object())
+
+    def nodes(self):
+        if not self.callbacks:
+            return [node.split('.')[0] for node in cmds.ls(LS_EXP)]
+        if self.handles is None:
+            self.scan()
+        nodes = []
+        for key, handle in list(self.handles.items()):
+            if not handle.isValid():
+                del self.handles[key]
+                continue
+            node = om.MFnDependencyNode(handle.object())
+            if node.hasAttribute(PICKER_HOLDER_ATTRIBUTE):
+                nodes.append(node.name())
+        return nodes
+
+
+holder_nodes = HolderNodeRegistry()
+
+
+def get_node_handle(node):
+    selection = om.MSelectionList()
+    selection.add(node)
+    mobject = om.MObject()
+    selection.getDependNode(0, mobject)
+    return om.MObjectHandle(mobject)
+
+
+class HolderNodeSet():
+    """
+    Set of holder nodes identified by their MObject rather than their name.
+    Maya gives the name of a deleted node to the next one created, a new
+    node must not be mistaken for a node already read.
+    """
+    def __init__(self, nodes=None):
+        self.handles = {}
+        self.update(nodes or [])
+
+    def update(self, nodes):
+        for node in nodes:
+            handle = get_node_handle(node)
+            self.handles[handle.hashCode()] = handle
+
+    def __contains__(self, node):
+        handle = get_node_handle(node)
+        known = self.handles.get(handle.hashCode())
+        # The hash code of a deleted node can be reused by a new one.
+        return (
+            known is not None and known.isValid() and
+            known.object() == handle.object())
+
+
 def list_picker_holder_nodes():
     """
     Look up in the scene all the nodes holding an attribute named
@@ -83,7 +291,7 @@ def list_picker_holder_nodes():
     This mignt happed if a node node is imported (creating a namespace or a
     incrementation).
     """
-    return [node.split(".")[0] for node in cmds.ls(LS_EXP)]
+    return holder_nodes.nodes()
 
 
 def clean_stray_picker_holder_nodes():
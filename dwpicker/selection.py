@@ -1,5 +1,6 @@
 
 from maya import cmds
+from dwpicker.profiling import probe
 
 
 class NameclashError(BaseException):
@@ -10,6 +11,7 @@ class NameclashError(BaseException):
         super(NameclashError, self).__init__(message + nodes)
 
 
+@probe('select_targets')
 def select_targets(shapes, selection_mode='replace'):
     shapes = [s for s in shapes if s.targets()]
     hovered = [s for s in shapes if s.hovered]
@@ -48,12 +50,26 @@ def select_targets(shapes, selection_mode='replace'):
         cmds.select(new_selection)
 
 
-def select_shapes_from_selection(shapes):
-    selection = cmds.ls(sl=True)
+def select_shapes_from_selection(shapes, targets_index=None, selection=None):
+    """
+    targets_index: optional {target: shape ids} mapping (see
+    PickerDocument.targets_index). Only the shapes referencing a selected node
+    are then checked.
+    selection: nodes selected, queried from Maya if not given.
+    """
+    if selection is None:
+        selection = cmds.ls(sl=True)
+    selection = set(selection)
+    if targets_index is not None:
+        candidates = {
+            id_ for node in selection for id_ in targets_index.get(node, ())}
     for shape in shapes:
         if not shape.targets():
             shape.selected = False
             continue
+        if targets_index is not None and shape.options['id'] not in candidates:
+            shape.selected = False
+            continue
         for target in shape.targets():
             if target not in selection:
                 shape.selected = False
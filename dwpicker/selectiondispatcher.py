@@ -0,0 +1,77 @@
+import traceback
+
+from maya import cmds
+import maya.OpenMaya as om
+from dwpicker.pyside import QtCore
+from dwpicker.optionvar import SELECTION_SYNC_LATENCY, get_optionvar
+
+
+class SelectionDispatcher():
+    """
+    Owns the only Maya SelectionChanged callback used by the picker.
+    A subscriber can be registered several times without being called twice
+    and the Maya callback only lives while there are subscribers.
+    Selection changes are coalesced: the first event starts a timer and the
+    selection is queried and given to the subscribers once when it times
+    out. A script changing the selection in a loop costs a single sync.
+    """
+    def __init__(self):
+        self.callback = None
+        self.subscribers = []
+        self._timer = None
+
+    @property
+    def timer(self):
+        if self._timer is None:
+            self._timer = QtCore.QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.flush)
+        return self._timer
+
+    def register(self, subscriber):
+        if subscriber in self.subscribers:
+            return
+        self.subscribers.append(subscriber)
+        if self.callback is None:
+            self.callback = om.MEventMessage.addEventCallback(
+                'SelectionChanged', self.dispatch)
+
+    def unregister(self, subscriber):
+        if subscriber not in self.subscribers:
+            return
+        self.subscribers.remove(subscriber)
+        if not self.subscribers:
+            self.remove_callback()
+
+    def remove_callback(self):
+        # A pending change is not dropped: the timer still flushes it, to
+        # the subscribers registered again meanwhile (callbacks reload).
+        if self.callback is None:
+            return
+        om.MMessage.removeCallback(self.callback)
+        self.callback = None
+
+    def dispatch(self, *_):
+        # The timer is not restarted when already running, this ensures the
+        # latency never exceeds the option value during a selection burst.
+        if self.timer.isActive():
+            return
+        self.timer.start(get_optionvar(SELECTION_SYNC_LATENCY))
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.stop()
+        # Targets are stored as the names returned by a regular ls, long
+        # names would not match them.
+        if not self.subscribers:
+            return
+        selection = cmds.ls(selection=True)
+        for subscriber in self.subscribers[:]:
+            # A failing subscriber must not prevent the others to sync.
+            try:
+                subscriber(selection)
+            except BaseException:
+                print(traceback.format_exc())
+
+
+dispatcher = SelectionDispatcher()
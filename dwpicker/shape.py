@@ -1,14 +1,15 @@
 from copy import deepcopy
 from dwpicker.pyside import QtCore, QtGui
-from dwpicker.geometry import proportional_rect
+from dwpicker.geometry import grow_rect, proportional_rect
+from dwpicker.imagecache import get_image
 from dwpicker.languages import execute_code, EXECUTION_WARNING
-from dwpicker.path import expand_path
+from dwpicker.profiling import probe
 from dwpicker.selection import select_targets
 from dwpicker.shapepath import (
     get_shape_painter_path, get_screenspace_qpath, get_absolute_path,
     get_default_path, get_worldspace_qpath)
 from dwpicker.templates import BUTTON
-from dwpicker.viewport import to_screenspace_coords
+from dwpicker.viewport import MAX_ZOOM, to_screenspace_coords
 
 
 def build_multiple_shapes(targets, override):
@@ -65,6 +66,21 @@ def to_shape_space_rect(rect, shape, force_world_space, viewportmapper):
     return rect
 
 
+def get_shape_viewport_rect(shape, viewportmapper, padding=2):
+    """
+    Viewport area covered by a shape drawing including its border. This is
+    used to repaint only the shapes which changed.
+    """
+    rect = to_shape_space_rect(
+        shape.bounding_rect(), shape, False, viewportmapper)
+    border = max(
+        shape.options['borderwidth.normal'],
+        shape.options['borderwidth.hovered'],
+        shape.options['borderwidth.clicked'])
+    border = to_shape_space(border, shape, False, viewportmapper)
+    return grow_rect(rect, border + padding)
+
+
 def cursor_in_shape(
         shape,
         world_cursor,
@@ -114,12 +130,31 @@ class Shape():
         self.selected = False
         self.options = options
         self.rect = get_shape_rect_from_options(options)
-        self.pixmap = None
+        self.image = None
         self.image_rect = None
+        # Cached pens, brushes and font (see painting.get_render_style).
+        self.render_style = None
         self.path = get_shape_painter_path(self)
         self.synchronize_image()
         self._buffer_path = None
 
+    def invalidate_render_style(self):
+        self.render_style = None
+
+    def synchronize_options(self, keys=None):
+        """
+        Update everything derived from the options after they were modified
+        from outside (undo, redo...).
+        keys: modified option names, used to skip the image reload if not
+        needed.
+        """
+        self.rect = get_shape_rect_from_options(self.options)
+        self.update_path()
+        self.render_style = None
+        prefixes = 'image.', 'shape'
+        if keys is None or any(k.startswith(prefixes) for k in keys):
+            self.synchronize_image()
+
     def set_clicked(self, cursor):
         self.clicked = self.rect.contains(cursor)
 
@@ -166,6 +201,7 @@ class Shape():
             return proportional_rect(rect, 70)
         return rect
 
+    @probe('command')
     def execute(self, command=None, button=None, shift=False, ctrl=False):
         if command is not None:
             commands = [command]
@@ -214,19 +250,21 @@ class Shape():
         return self.options['visibility_layer']
 
     def synchronize_image(self):
-        path = expand_path(self.options['image.path'])
-        self.pixmap = QtGui.QPixmap(path)
+        self.image_rect = self.get_image_rect()
+        self.image = get_image(
+            self.options['image.path'], self.image_max_display_size())
+
+    def get_image_rect(self):
         if self.options['image.fit'] and not self.options['image.ratio']:
-            self.image_rect = None
-            return
+            return None
         if not self.options['image.fit']:
-            self.image_rect = QtCore.QRectF(
+            image_rect = QtCore.QRectF(
                 self.rect.left(),
                 self.rect.top(),
                 self.options['image.width'],
                 self.options['image.height'])
-            self.image_rect.moveCenter(self.bounding_rect().center())
-            return
+            image_rect.moveCenter(self.bounding_rect().center())
+            return image_rect
         rect = self.bounding_rect()
         ratio = self.options['image.width'] / self.options['image.height']
         width = rect.width()
@@ -234,8 +272,22 @@ class Shape():
         if rect.height() < height:
             width = rect.height() * ratio
             height = rect.height()
-        self.image_rect = QtCore.QRectF(rect.left(), rect.top(), width, height)
-        self.image_rect.moveCenter(rect.center())
+        image_rect = QtCore.QRectF(rect.left(), rect.top(), width, height)
+        image_rect.moveCenter(rect.center())
+        return image_rect
+
+    def image_max_display_size(self):
+        """
+        Largest size in pixels the image can be painted at. The image
+        doesn't need to be decoded bigger.
+        """
+        size = (self.image_rect or self.content_rect()).size()
+        if self.options['shape.space'] == 'world':
+            size *= MAX_ZOOM
+        application = QtGui.QGuiApplication.instance()
+        if application is not None:
+            size *= application.devicePixelRatio()
+        return size
 
 
 def _find_commands(commands, button, ctrl=False, shift=False):
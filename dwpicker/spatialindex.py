@@ -0,0 +1,82 @@
+import math
+from collections import defaultdict
+
+
+DEFAULT_CELL_SIZE = 128
+
+
+def rect_edges(rect):
+    """
+    Return left, top, right, bottom. The QRect right() and bottom() are one
+    pixel short of the rect edge, they are computed from the size to give
+    the same edges for a QRect and a QRectF. The rect can have a negative
+    size (e.g. a selection dragged to the top left).
+    """
+    left, right = sorted((rect.x(), rect.x() + rect.width()))
+    top, bottom = sorted((rect.y(), rect.y() + rect.height()))
+    return left, top, right, bottom
+
+
+class SpatialIndex():
+    """
+    Uniform grid used to list the shapes which can be under a point or
+    intersect a rect without testing every shape of a panel.
+    World space shapes are registered in all the cells covered by their
+    bounding rect. Screen space shapes follow the viewport, they can't be
+    stored in the grid and are always returned as candidates.
+    Query results keep the document z-order (bottom to top).
+    """
+    def __init__(self, shapes, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.cells = defaultdict(list)
+        self.screen_space_shapes = []
+        self.orders = {}
+        for order, shape in enumerate(shapes):
+            self.orders[id(shape)] = order
+            if shape.options['shape.space'] == 'screen':
+                self.screen_space_shapes.append(shape)
+                continue
+            cells = self.cells_range(*rect_edges(shape.bounding_rect()))
+            for cell in cells:
+                self.cells[cell].append(shape)
+
+    def cell(self, x, y):
+        return (
+            int(math.floor(x / self.cell_size)),
+            int(math.floor(y / self.cell_size)))
+
+    def cells_range(self, left, top, right, bottom):
+        left, top = self.cell(left, top)
+        right, bottom = self.cell(right, bottom)
+        return (
+            (x, y)
+            for x in range(left, right + 1)
+            for y in range(top, bottom + 1))
+
+    def shapes_at(self, point):
+        shapes = self.cells.get(self.cell(point.x(), point.y()), [])
+        return self.sort(shapes + self.screen_space_shapes)
+
+    def shapes_in_rect(self, rect):
+        edges = rect_edges(rect)
+        left, top = self.cell(*edges[:2])
+        right, bottom = self.cell(*edges[2:])
+        cells_count = (right - left + 1) * (bottom - top + 1)
+        if cells_count > len(self.cells):
+            # Huge query rect, faster to filter the populated cells.
+            cells = [
+                shapes for (x, y), shapes in self.cells.items()
+                if left <= x <= right and top <= y <= bottom]
+        else:
+            cells = [
+                self.cells[cell] for cell in
+                self.cells_range(*edges) if cell in self.cells]
+        shapes = {id(s): s for shapes in cells for s in shapes}
+        shapes.update({id(s): s for s in self.screen_space_shapes})
+        return self.sort(shapes.values())
+
+    def sort(self, shapes):
+        shapes = {id(s): s for s in shapes}
+        return [
+            shapes[key] for key in
+            sorted(shapes, key=self.orders.__getitem__)]
@@ -0,0 +1,171 @@
+"""
+Record the mouse, wheel and key events received by the pickers and the
+editor canvases to a trace file. The trace holds a copy of the documents
+and of the views state, so it can be replayed outside of Maya (see
+benchmarks.replay) to reproduce a slow interaction.
+"""
+import json
+from copy import deepcopy
+
+from dwpicker.appinfos import VERSION
+from dwpicker.profiling import clock
+from dwpicker.pyside import QtCore, QtWidgets
+
+
+TRACED_WIDGETS = {
+    'PickerPanelView': 'picker',
+    'ShapeEditCanvas': 'canvas'}
+MOUSE_EVENTS = {
+    QtCore.QEvent.MouseMove: 'mouse_move',
+    QtCore.QEvent.MouseButtonPress: 'mouse_press',
+    QtCore.QEvent.MouseButtonRelease: 'mouse_release',
+    QtCore.QEvent.MouseButtonDblClick: 'mouse_double_click'}
+KEY_EVENTS = {
+    QtCore.QEvent.KeyPress: 'key_press',
+    QtCore.QEvent.KeyRelease: 'key_release'}
+WHEEL_EVENTS = {
+    QtCore.QEvent.Wheel: 'wheel'}
+
+
+def enum_value(value):
+    # PySide6 enums can't be converted with int() directly.
+    return int(getattr(value, 'value', value))
+
+
+def event_position(event):
+    # pos() is deprecated (mouse) or removed (wheel) on Qt6, position()
+    # doesn't exist on the older Qt5 versions.
+    if hasattr(event, 'position'):
+        return QtCore.QPointF(event.position())
+    return QtCore.QPointF(event.pos())
+
+
+class TraceRecorder(QtCore.QObject):
+    """
+    Application event filter listening the traced widgets. The documents
+    and the views are stored the first time one of their event is
+    recorded.
+    """
+    def __init__(self, parent=None):
+        super(TraceRecorder, self).__init__(parent)
+        self.trace = None
+        self.start_time = None
+        self.documents = []
+        self.views = []
+
+    @property
+    def recording(self):
+        return self.trace is not None
+
+    def start(self):
+        self.trace = {
+            'version': VERSION,
+            'documents': [],
+            'views': [],
+            'events': []}
+        self.documents = []
+        self.views = []
+        self.start_time = clock()
+        QtWidgets.QApplication.instance().installEventFilter(self)
+
+    def stop(self):
+        QtWidgets.QApplication.instance().removeEventFilter(self)
+        trace, self.trace = self.trace, None
+        self.documents = []
+        self.views = []
+        return trace
+
+    def eventFilter(self, widget, event):
+        kind = TRACED_WIDGETS.get(type(widget).__name__)
+        if kind is None:
+            return False
+        event_type = event.type()
+        if event_type in MOUSE_EVENTS:
+            self.record_mouse_event(widget, kind, event)
+        elif event_type in WHEEL_EVENTS:
+            self.record_wheel_event(widget, kind, event)
+        elif event_type in KEY_EVENTS:
+            self.record_key_event(widget, kind, event)
+        return False
+
+    def view_index(self, widget, kind):
+        for i, view in enumerate(self.views):
+            if view is widget:
+                return i
+
+        for i, document in enumerate(self.documents):
+            if document is widget.document:
+                document_index = i
+                break
+        else:
+            self.documents.append(widget.document)
+            self.trace['documents'].append(deepcopy(widget.document.data))
+            document_index = len(self.documents) - 1
+
+        mapper = widget.viewportmapper
+        self.views.append(widget)
+        self.trace['views'].append({
+            'kind': kind,
+            'document': document_index,
+            'panel': getattr(widget, 'panel', None),
+            'size': [widget.width(), widget.height()],
+            'zoom': mapper.zoom,
+            'origin': [mapper.origin.x(), mapper.origin.y()]})
+        return len(self.views) - 1
+
+    def record(self, widget, kind, event, **data):
+        data['time'] = clock() - self.start_time
+        data['view'] = self.view_index(widget, kind)
+        data['modifiers'] = enum_value(event.modifiers())
+        self.trace['events'].append(data)
+
+    def record_mouse_event(self, widget, kind, event):
+        position = event_position(event)
+        self.record(
+            widget, kind, event,
+            type=MOUSE_EVENTS[event.type()],
+            position=[position.x(), position.y()],
+            button=enum_value(event.button()),
+            buttons=enum_value(event.buttons()))
+
+    def record_wheel_event(self, widget, kind, event):
+        position = event_position(event)
+        delta = event.angleDelta()
+        self.record(
+            widget, kind, event,
+            type='wheel',
+            position=[position.x(), position.y()],
+            delta=[delta.x(), delta.y()],
+            buttons=enum_value(event.buttons()))
+
+    def record_key_event(self, widget, kind, event):
+        self.record(
+            widget, kind, event,
+            type=KEY_EVENTS[event.type()],
+            key=event.key(),
+            text=event.text(),
+            autorepeat=event.isAutoRepeat())
+
+
+_recorder = None
+
+
+def start_recording():
+    global _recorder
+    if _recorder is None:
+        _recorder = TraceRecorder()
+    _recorder.start()
+
+
+def stop_recording(filename=None):
+    """
+    Stop the recording and return the trace. It is saved as json if a
+    filename is given.
+    """
+    if _recorder is None or not _recorder.recording:
+        return None
+    trace = _recorder.stop()
+    if filename:
+        with open(filename, 'w') as f:
+            json.dump(trace, f)
+    return trace
@@ -2,38 +2,81 @@
 from copy import deepcopy
 
 
+MAX_UNDO_STEPS = 500
+# Rough estimation (in bytes) of the memory the history can use.
+MAX_UNDO_MEMORY = 64 * 1024 * 1024
+MISSING = '__missing__'
+
+
 class UndoManager():
+    """
+    The history is stored as deltas between two recorded states:
+        {
+            'general': {key: (old value, new value)},
+            'shapes': {shape id: {key: (old value, new value)}},
+            'added': {shape id: (index, options)},
+            'removed': {shape id: (index, options)},
+            'order': (old ids order, new ids order) or None
+        }
+    A copy of the last recorded state is kept to compute the next delta.
+    Undo and redo patch the picker data given instead of replacing it.
+    """
     def __init__(self, data):
-        self._current_state = deepcopy(data)
+        self._snapshot = deepcopy(data)
         self._modified = False
         self._undo_stack = []
         self._redo_stack = []
+        self._memory = 0
 
-    @property
-    def data(self):
-        return deepcopy(self._current_state)
-
-    def undo(self):
+    def undo(self, data):
+        """
+        Patch the data to its previous recorded state.
+        Return the list of the deltas applied (empty if nothing to undo).
+        """
         if not self._undo_stack:
-            return False
-        self._redo_stack.append(self.data)
-        self._current_state = deepcopy(self._undo_stack[-1])
-        del self._undo_stack[-1]
-        return True
+            return []
+        deltas = self.revert_unrecorded_changes(data)
+        delta, size = self._undo_stack.pop()
+        apply_delta(data, delta, 0)
+        apply_delta(self._snapshot, delta, 0)
+        self._redo_stack.append((delta, size))
+        return deltas + [delta]
 
-    def redo(self):
+    def redo(self, data):
         if not self._redo_stack:
-            return False
-        self._undo_stack.append(deepcopy(self._current_state))
-        self._current_state = deepcopy(self._redo_stack[-1])
-        del self._redo_stack[-1]
-        return True
+            return []
+        deltas = self.revert_unrecorded_changes(data)
+        delta, size = self._redo_stack.pop()
+        apply_delta(data, delta, 1)
+        apply_delta(self._snapshot, delta, 1)
+        self._undo_stack.append((delta, size))
+        return deltas + [delta]
+
+    def revert_unrecorded_changes(self, data):
+        delta = compute_delta(self._snapshot, data)
+        if is_empty_delta(delta):
+            return []
+        apply_delta(data, delta, 0)
+        return [delta]
 
     def set_data_modified(self, data):
-        self._redo_stack = []
-        self._undo_stack.append(self.data)
-        self._current_state = deepcopy(data)
+        """
+        Record the data changes, return the delta (None if unchanged).
+        """
         self._modified = True
+        delta = compute_delta(self._snapshot, data)
+        if is_empty_delta(delta):
+            return None
+        apply_delta(self._snapshot, delta, 1)
+        self._redo_stack = []
+        size = len(repr(delta))
+        self._undo_stack.append((delta, size))
+        self._memory = sum(size for _, size in self._undo_stack)
+        while len(self._undo_stack) > 1 and (
+                len(self._undo_stack) > MAX_UNDO_STEPS or
+                self._memory > MAX_UNDO_MEMORY):
+            self._memory -= self._undo_stack.pop(0)[1]
+        return delta
 
     def set_data_saved(self):
         self._modified = False
@@ -45,3 +88,124 @@ class UndoManager():
     def reset_stacks(self):
         self._undo_stack = []
         self._redo_stack = []
+        self._memory = 0
+
+
+def diff_dicts(old, new):
+    if old == new:
+        return {}
+    keys = set(old) | set(new)
+    return {
+        key: (old.get(key, MISSING), deepcopy(new.get(key, MISSING)))
+        for key in keys if old.get(key, MISSING) != new.get(key, MISSING)}
+
+
+def compute_delta(old_data, new_data):
+    old_shapes = {options['id']: options for options in old_data['shapes']}
+    new_shapes = {options['id']: options for options in new_data['shapes']}
+    old_order = [options['id'] for options in old_data['shapes']]
+    new_order = [options['id'] for options in new_data['shapes']]
+
+    added = {
+        id_: (i, deepcopy(new_shapes[id_]))
+        for i, id_ in enumerate(new_order) if id_ not in old_shapes}
+    removed = {
+        id_: (i, old_shapes[id_])
+        for i, id_ in enumerate(old_order) if id_ not in new_shapes}
+
+    shapes = {}
+    for id_ in new_order:
+        if id_ in added:
+            continue
+        changes = diff_dicts(old_shapes[id_], new_shapes[id_])
+        if changes:
+            shapes[id_] = changes
+
+    order = None
+    survivors_old_order = [id_ for id_ in old_order if id_ not in removed]
+    survivors_new_order = [id_ for id_ in new_order if id_ not in added]
+    if survivors_old_order != survivors_new_order:
+        order = old_order, new_order
+
+    return {
+        'general': diff_dicts(old_data['general'], new_data['general']),
+        'shapes': shapes,
+        'added': added,
+        'removed': removed,
+        'order': order}
+
+
+def modified_shape_keys(deltas):
+    """
+    Return {shape id: option names} of the shapes modified by the deltas.
+    """
+    keys = {}
+    for delta in deltas:
+        for id_, changes in delta['shapes'].items():
+            keys.setdefault(id_, set()).update(changes)
+    return keys
+
+
+def target_changes(delta):
+    """
+    Return {node name: difference of the number of shapes targeting it}
+    between the old and the new state of the delta.
+    """
+    changes = {}
+
+    def count(targets, difference):
+        for target in targets or []:
+            changes[target] = changes.get(target, 0) + difference
+
+    for shape_changes in delta['shapes'].values():
+        if 'action.targets' not in shape_changes:
+            continue
+        old, new = shape_changes['action.targets']
+        count(old if old != MISSING else None, -1)
+        count(new if new != MISSING else None, 1)
+    for _, options in delta['added'].values():
+        count(options.get('action.targets'), 1)
+    for _, options in delta['removed'].values():
+        count(options.get('action.targets'), -1)
+    return {target: n for target, n in changes.items() if n}
+
+
+def is_empty_delta(delta):
+    return not any(delta.values())
+
+
+def apply_delta(data, delta, index):
+    """
+    Patch the picker data in place.
+    index: 0 to restore the old values (undo), 1 the new ones (redo).
+    """
+    update_dict(data['general'], delta['general'], index)
+
+    to_remove, to_insert = delta['added'], delta['removed']
+    if index == 1:
+        to_remove, to_insert = to_insert, to_remove
+
+    shapes = [s for s in data['shapes'] if s['id'] not in to_remove]
+    shapes_by_id = {options['id']: options for options in shapes}
+    for id_, changes in delta['shapes'].items():
+        update_dict(shapes_by_id[id_], changes, index)
+
+    inserted = sorted(
+        (i, id_, deepcopy(options))
+        for id_, (i, options) in to_insert.items())
+    if delta['order']:
+        shapes_by_id.update({id_: options for _, id_, options in inserted})
+        shapes = [shapes_by_id[id_] for id_ in delta['order'][index]]
+    else:
+        for i, _, options in inserted:
+            shapes.insert(i, options)
+    # The list is modified in place, it can be shared with the shapes.
+    data['shapes'][:] = shapes
+
+
+def update_dict(dictionary, changes, index):
+    for key, values in changes.items():
+        if values[index] == MISSING:
+            dictionary.pop(key, None)
+            continue
+        dictionary[key] = deepcopy(values[index])
@@ -1,15 +1,15 @@
 import re
+import threading
+import time
 import webbrowser
-try:
-    from urllib.request import urlopen
-except ImportError:
-    from urllib2 import urlopen  # python2
+from functools import partial
 
-from maya import cmds
+import maya.utils
 
-from dwpicker.dialog import UpdateAvailableDialog
 from dwpicker.appinfos import VERSION
-from dwpicker.optionvar import CHECK_FOR_UPDATE
+from dwpicker.optionvar import (
+    CHECK_FOR_UPDATE, LAST_UPDATE_CHECK, LATEST_VERSION, get_optionvar,
+    save_optionvar)
 
 
 APPINFOS_URL = (
@@ -18,18 +18,61 @@ APPINFOS_URL = (
 LATEST_RELEASE_URL = (
     'https://github.com/DreamWall-Animation/dwpicker/releases/latest')
 VERSION_PATTERN = r'\d(\.|,).\d(\.|,).\d'
+# Seconds.
+UPDATE_CHECK_TIMEOUT = 3
+UPDATE_CHECK_INTERVAL = 24 * 60 * 60
 
 
 def warn_if_update_available():
-    if not cmds.optionVar(query=CHECK_FOR_UPDATE):
+    """
+    The latest version is requested at most once a day, in a background
+    thread to never block Maya (e.g. offline workstation). In between, the
+    version found by the last check is used.
+    """
+    if not get_optionvar(CHECK_FOR_UPDATE):
         return
+    last_check = get_optionvar(LAST_UPDATE_CHECK)
+    if time.time() - last_check < UPDATE_CHECK_INTERVAL:
+        warn_if_newer(get_optionvar(LATEST_VERSION))
+        return
+    thread = threading.Thread(target=request_latest_version)
+    thread.daemon = True
+    thread.start()
+
+
+def request_latest_version():
     try:
-        appinfos = urlopen(APPINFOS_URL).read().decode()
-        latest_version_str = re.search(VERSION_PATTERN, appinfos)[0]
-        latest_version = tuple(
-            int(n) for n in latest_version_str.replace(',', '.').split('.'))
-        if VERSION < latest_version:
-            if UpdateAvailableDialog(latest_version_str).exec_():
-                webbrowser.open(LATEST_RELEASE_URL)
+        try:
+            from urllib.request import urlopen
+        except ImportError:
+            from urllib2 import urlopen  # python2
+        response = urlopen(APPINFOS_URL, timeout=UPDATE_CHECK_TIMEOUT)
+        appinfos = response.read().decode()
+        latest_version = re.search(VERSION_PATTERN, appinfos).group(0)
     except BaseException:
-        print('DwPicker: could not check for new version')
+        maya.utils.executeDeferred(warn_check_failed)
+        return
+    # Maya commands and the UI can only be used from the main thread.
+    maya.utils.executeDeferred(
+        partial(latest_version_received, latest_version))
+
+
+def warn_check_failed():
+    print('DwPicker: could not check for new version')
+
+
+def latest_version_received(latest_version):
+    save_optionvar(LAST_UPDATE_CHECK, int(time.time()))
+    save_optionvar(LATEST_VERSION, latest_version)
+    warn_if_newer(latest_version)
+
+
+def warn_if_newer(latest_version):
+    if not latest_version:
+        return
+    from dwpicker.dialog import UpdateAvailableDialog
+    version = tuple(
+        int(n) for n in latest_version.replace(',', '.').split('.'))
+    if VERSION < version:
+        if UpdateAvailableDialog(latest_version).exec_():
+            webbrowser.open(LATEST_RELEASE_URL)
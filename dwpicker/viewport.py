@@ -2,6 +2,10 @@
 from dwpicker.pyside import QtCore, QtGui
 
 
+MAX_ZOOM = 5.0
+MIN_ZOOM = .1
+
+
 class ViewportMapper():
     """
     Used to translate/map between:
@@ -46,11 +50,11 @@ class ViewportMapper():
 
     def zoomin(self, factor=10.0):
         self.zoom += self.zoom * factor
-        self.zoom = min(self.zoom, 5.0)
+        self.zoom = min(self.zoom, MAX_ZOOM)
 
     def zoomout(self, factor=10.0):
         self.zoom -= self.zoom * factor
-        self.zoom = max(self.zoom, .1)
+        self.zoom = max(self.zoom, MIN_ZOOM)
 
     def center_on_point(self, units_center):
         """Given current zoom and viewport size, set the origin point."""
@@ -64,7 +68,7 @@ class ViewportMapper():
             float(self.viewsize.height()) / units_rect.height()])
         if self.zoom > 1:
             self.zoom *= 0.7  # lower zoom to add some breathing space
-        self.zoom = max(self.zoom, .1)
+        self.zoom = max(self.zoom, MIN_ZOOM)
         self.center_on_point(units_rect.center())
 
     def to_viewport_transform(self):